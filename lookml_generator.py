@@ -1,39 +1,1075 @@
-import pandas as pd
-import numpy as np
 import re
 import os
 import json
 import argparse
+import csv
+import glob
+import fnmatch
+import sys
+import zipfile
+import tempfile
+import textwrap
+from contextlib import closing
+from datetime import datetime, timedelta
+from xml.etree import ElementTree
+import hashlib
+import pickle
+import importlib.util
+import time
+from collections import namedtuple
+from operator import itemgetter
 
-def load_base_columns(base_views_path):
-    base_columns = {}
-    for file_name in os.listdir(base_views_path):
-        if file_name.endswith(".view.lkml"):
-            view_name = file_name.replace(".view.lkml", "")
-            with open(os.path.join(base_views_path, file_name), 'r') as f:
-                content = f.read()
-                columns = re.findall(r'(dimension|dimension_group|measure): (\w+)', content)
-                base_columns[view_name] = {c[1].upper(): c[0] for c in columns}
-    return base_columns
+__version__ = "4.25.17"
 
-base_columns = load_base_columns('#models/_base/views')
+PARSE_CACHE_DIR = '.lookml_cache'
+MANIFEST_FILE = '.lookml_manifest.json'
+
+# Kolumny specyfikacji używane przy generowaniu
+SPEC_COLUMNS = ['ID', 'TABLE NAME', 'COLUMN NAME', 'TYPE', 'DESCRIPTION', 'LABEL', 'GROUP_LABEL']
+# Kolumny o niewielkiej liczbie różnych wartości - przechowywane jako category
+CATEGORICAL_COLUMNS = ['TABLE NAME', 'TYPE', 'GROUP_LABEL']
+# Kolumny z powtarzającymi się tekstami - internowane przy wczytywaniu (jeden obiekt str na wartość)
+INTERNED_COLUMNS = ['TABLE NAME', 'TYPE', 'DESCRIPTION', 'LABEL', 'GROUP_LABEL']
+
+# Tokeny LookML istotne dla indeksu widoków bazowych. Komentarze, teksty w cudzysłowach i bloki SQL/HTML
+# zakończone ;; są pomijane w całości, więc zawarte w nich "dimension: x" nie jest brane za pole.
+# Klucz musi stać tuż przed dwukropkiem (dimension: x, jak w dawnym regexie)
+FIELD_KEYS = ('dimension', 'dimension_group', 'measure')
+LOOKML_KEYS = FIELD_KEYS + ('type', 'extends', 'html', 'expression')
+# Blok bez ;; (albo lista extends bez ]) sięga do końca pliku - żaden tekst nie jest przeszukiwany dwa razy
+_SQL_BODY = r':[^;]*(?:;(?!;)[^;]*)*(?:;;|\Z)'
+
+def _lookml_key(key):
+    # Klucz jako osobne słowo (nie koniec np. datatype:)
+    return f'{key}(?<!\\w{key})'
+
+def _lookml_token_pattern(string):
+    return re.compile('|'.join([
+        r'#[^\n]*',
+        string,
+        r'[{}]',
+        _lookml_key('sql') + r'\w*' + _SQL_BODY,
+        _lookml_key('html') + _SQL_BODY,
+        _lookml_key('expression') + _SQL_BODY,
+        _lookml_key('dimension_group') + r':\s*\w+',
+        _lookml_key('dimension') + r':\s*\w+',
+        _lookml_key('measure') + r':\s*\w+',
+        _lookml_key('extends') + r':\s*\[[^\]]*\]?',
+        _lookml_key('type') + r':\s*\w+',
+    ]))
+
+LOOKML_TOKEN = _lookml_token_pattern(r'"[^"]*"')
+# Wariant dla plików z \ - teksty mogą zawierać \"
+LOOKML_TOKEN_ESCAPES = _lookml_token_pattern(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+
+_WORD_CHARS = r'[^\s{}\[\]"#:;,]'
+_SIMPLE_LIST = r'[^\]"#:{}\[]*\]'
+
+def _lookml_field_pattern(string, depth=3):
+    # Szybka ścieżka: jedno dopasowanie obejmuje całe pole (deklaracja, { ... }), a tekst poza polami jest
+    # dzielony na elementy: klucze z wartością, teksty, listy, bloki ;;, komentarze. Elementy zaczynają się
+    # różnie (jednoznaczna gramatyka), więc nieudane dopasowanie nie cofa się wykładniczo. Czego gramatyka
+    # nie obejmuje (np. blok zagnieżdżony głębiej niż depth, brak ;;), trafia do grupy błędu z resztą pliku
+    comment = r'#[^\n]*(?![^\n])'
+    word = _WORD_CHARS + '+(?!' + _WORD_CHARS + ')'
+    key = r'(?!sql|' + '|'.join(key + ':' for key in LOOKML_KEYS) + r')\w+:'
+    list_ = (r'\[(?:' + _SIMPLE_LIST + r'|(?!' + _SIMPLE_LIST + r')\s*(?:(?:'
+             + '|'.join([string, ',', comment, key, word]) + r')\s*)*?\])')
+    # Klucz z wartością jako jeden element; sam klucz tylko przed blokiem { ... }
+    key_value = key + r'\s*(?:' + '|'.join([string, word, list_]) + r'|(?=\{))'
+    sql_body = r'[^;]*;(?:;|(?:[^;]+;)+;)'
+    items = [r'sql\w*:' + sql_body, string, comment, list_, 'html:' + sql_body, 'expression:' + sql_body]
+    # Bloki zagnieżdżone w polu - ich type: i extends: nie należą do pola
+    block = None
+    for _ in range(depth):
+        nested = [r'\{\s*(?:(?:' + block + r')\s*)*?\}'] if block else []
+        block = '|'.join([r'type:\s*\w+(?!\w)', r'extends:\s*\[[^\]]*\]'] + items + [key_value, word] + nested)
+    body = '|'.join([r'type:\s*(\w+)(?!\w)', r'extends:\s*\[[^\]]*\]'] + items + [key_value, word]
+                    + [r'\{\s*(?:(?:' + block + r')\s*)*?\}'])
+    # Grupy: rodzaj i nazwa pola, type: pola, extends: widoku albo reszta pliku (błąd)
+    field = r'(dimension_group|dimension|measure):\s*(\w+)\s*\{\s*(?:(?:' + body + r')\s*)*?\}'
+    return re.compile(r'\s*(?:' + '|'.join([field, r'type:\s*\w+(?!\w)'] + items + [
+        key_value,
+        r'(?!extends:)' + word,
+        r'[{}]',
+        r'(extends:\s*\[[^\]]*\]|\S[\s\S]*)',
+    ]) + ')')
+
+LOOKML_FIELD = _lookml_field_pattern(r'"[^"]*"')
+LOOKML_FIELD_ESCAPES = _lookml_field_pattern(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+LOOKML_EXTENDS = re.compile(r'extends:\s*\[([^\]]*)\]')
+
+def _scan_lookml_view(content, escapes):
+    # Jedno przejście po tokenach ze śledzeniem zagnieżdżenia - dla plików spoza szybkiej ścieżki
+    fields = {}
+    types = {}
+    extends = []
+    depth = 0
+    field = None
+    field_depth = 0
+    for token in (LOOKML_TOKEN_ESCAPES if escapes else LOOKML_TOKEN).findall(content):
+        first = token[0]
+        # Kolejność sprawdzeń wg częstości tokenów: teksty, nawiasy, SQL, komentarze
+        if first == '"':
+            continue
+        elif first == '{':
+            depth += 1
+        elif first == '}':
+            depth -= 1
+            if field is not None and depth < field_depth:
+                field = None
+        elif token[-1] == ';' or first == '#':
+            continue
+        else:
+            key, _, value = token.partition(':')
+            value = value.strip()
+            if key == 'type':
+                # Tylko type: samego pola, nie bloków zagnieżdżonych w polu
+                if field is not None and depth == field_depth:
+                    types[field] = value
+            elif key == 'extends':
+                if field is None:
+                    extends.extend(name.strip() for name in value[1:].partition(']')[0].split(',') if name.strip())
+            elif key in FIELD_KEYS:
+                field = value.upper()
+                fields[field] = key
+                field_depth = depth + 1
+            # Pozostałe: blok sql...:/html:/expression: bez ;; na końcu pliku
+    return {'fields': fields, 'types': types, 'extends': extends}
+
+def parse_lookml_view(content):
+    # Pola (NAZWA -> rodzaj), typy pól (type:) i extends widoku - zwykle jednym dopasowaniem na pole
+    escapes = '\\' in content
+    fields = {}
+    types = {}
+    extends = []
+    for kind, name, field_type, value in (LOOKML_FIELD_ESCAPES if escapes else LOOKML_FIELD).findall(content):
+        if kind:
+            name = name.upper()
+            fields[name] = kind
+            if field_type:
+                types[name] = field_type
+        elif value:
+            token = LOOKML_EXTENDS.match(value)
+            if token is None:
+                return _scan_lookml_view(content, escapes)
+            extends.extend(name.strip() for name in token.group(1).split(',') if name.strip())
+    return {'fields': fields, 'types': types, 'extends': extends}
+
+def parse_base_view(file_path):
+    with open(file_path, 'r') as f:
+        return parse_lookml_view(f.read())
+
+BASE_VIEW_PATTERNS = ['*.view.lkml']
+
+def _base_index_cache_path(base_views_path, cache_dir, scan_key=''):
+    key = hashlib.sha256(f"{os.path.abspath(base_views_path)}:{scan_key}".encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"base_index_{key}.json")
+
+def scan_base_view_files(base_views_path, recursive=False, include=None, exclude=None):
+    # Pliki widoków jako (ścieżka względna z '/', ścieżka, stat) - w kolejności os.scandir, katalogi w głąb.
+    # include/exclude to wzorce glob dla ścieżki względnej; katalog pasujący do exclude nie jest przeglądany
+    include = include or BASE_VIEW_PATTERNS
+    exclude = exclude or []
+    files = []
+    pending = [('', base_views_path)]
+    while pending:
+        prefix, directory = pending.pop()
+        subdirectories = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                relative_path = prefix + entry.name
+                if any(fnmatch.fnmatch(relative_path, pattern) for pattern in exclude):
+                    continue
+                if entry.is_dir():
+                    # Bez dowiązań do katalogów - np. sub/up -> .. dawałoby nieskończoną rekursję
+                    if recursive and not entry.is_symlink():
+                        subdirectories.append((relative_path + '/', entry.path))
+                elif any(fnmatch.fnmatch(relative_path, pattern) for pattern in include):
+                    files.append((relative_path, entry.path, entry.stat()))
+        # Odwrotnie na stos, aby podkatalogi były przeglądane w kolejności listowania
+        pending.extend(reversed(subdirectories))
+    return files
+
+def _parse_base_views(paths, workers=None):
+    # Odczyt plików w wątkach - przy katalogu sieciowym czas to głównie oczekiwanie na I/O
+    if len(paths) < 2 or workers == 1:
+        return [parse_base_view(path) for path in paths]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_base_view, paths))
+
+def load_base_views(base_views_path, cache_dir=None, recursive=False, include=None, exclude=None, workers=None):
+    # {widok: {'fields': ..., 'types': ..., 'extends': ..., 'file': ścieżka względna}}
+    # Z cache_dir indeks jest zapisywany w pliku - ponownie parsowane są tylko pliki nowe lub zmienione (mtime, rozmiar)
+    scan_key = json.dumps([recursive, include, exclude])
+    cache_path = _base_index_cache_path(base_views_path, cache_dir, scan_key) if cache_dir else None
+    cached = {}
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            # Zmiana wersji generatora (np. sposobu parsowania) unieważnia cały indeks
+            if index.get('version') == __version__:
+                cached = index['files']
+        except (OSError, ValueError, KeyError):
+            cached = {}
+    files = {}
+    changed = []
+    for relative_path, path, stat in scan_base_view_files(base_views_path, recursive, include, exclude):
+        key = [stat.st_mtime_ns, stat.st_size]
+        item = cached.get(relative_path)
+        if item is None or item['key'] != key:
+            item = {'key': key}
+            changed.append((item, path))
+        files[relative_path] = item
+    for (item, _), view in zip(changed, _parse_base_views([path for _, path in changed], workers)):
+        item['view'] = view
+    base_views = {}
+    for relative_path, item in files.items():
+        view_name = os.path.basename(relative_path).replace(".view.lkml", "")
+        if view_name in base_views:
+            print(f"Pominięto powtórzony widok bazowy {view_name}: {relative_path}")
+            continue
+        base_views[view_name] = dict(item['view'], file=relative_path)
+    # Zapis tylko po zmianie: pliki nowe, zmienione lub usunięte
+    if cache_path and (changed or files.keys() != cached.keys()):
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': __version__, 'path': os.path.abspath(base_views_path), 'files': files}, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Nie zapisano indeksu widoków bazowych {cache_path}: {e}")
+    return base_views
+
+def load_base_columns(base_views_path, cache_dir=None, recursive=False, include=None, exclude=None, workers=None):
+    return {view_name: view['fields']
+            for view_name, view in load_base_views(base_views_path, cache_dir, recursive, include, exclude, workers).items()}
+
+BASE_VIEWS_PATH = '#models/_base/views'
+
+# Wynik dopasowania tabeli do widoków bazowych
+BaseMatch = namedtuple('BaseMatch', ['extends_views', 'commented', 'missing'])
+
+class BaseViewRegistry:
+    # Widoki bazowe z katalogu path, wczytywane przy pierwszym użyciu
+    # views: {widok: {'fields': {KOLUMNA: rodzaj pola}, 'types': {KOLUMNA: type}, 'extends': [...], 'file': ...}}
+    # columns: {widok: {KOLUMNA: rodzaj pola}} - razem z polami odziedziczonymi przez extends
+    # column_index: {KOLUMNA: [numery widoków]} - indeks odwrócony do dopasowania tabel, tylko po własnych polach widoków
+
+    def __init__(self, path=BASE_VIEWS_PATH, columns=None, cache_dir=None, recursive=False, include=None, exclude=None,
+                 workers=None):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.recursive = recursive
+        self.include = include
+        self.exclude = exclude
+        self.workers = workers
+        self._views = None
+        self._columns = columns
+        self._column_index = None
+        self._view_names = None
+        self._column_sets = None
+        if columns is not None:
+            self._views = {view_name: {'fields': fields, 'types': {}, 'extends': [], 'file': f"{view_name}.view.lkml"}
+                           for view_name, fields in columns.items()}
+
+    @property
+    def views(self):
+        if self._views is None:
+            self._views = load_base_views(self.path, self.cache_dir, self.recursive, self.include, self.exclude, self.workers)
+        return self._views
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            # Domknięcie extends liczone raz dla każdego widoku i zapamiętywane - dopasowanie tabel
+            # korzysta z gotowych zbiorów pól, bez ponownego przechodzenia łańcucha
+            closures = {}
+            self._columns = {view_name: self._inherited_fields(view_name, closures, []) for view_name in self.views}
+        return self._columns
+
+    def _inherited_fields(self, view_name, closures, chain):
+        if view_name in closures:
+            return closures[view_name]
+        view = self.views[view_name]
+        if not view['extends']:
+            closures[view_name] = view['fields']
+            return view['fields']
+        if view_name in chain:
+            cycle = chain[chain.index(view_name):] + [view_name]
+            print(f"Cykl extends w widokach bazowych: {' -> '.join(cycle)}")
+            return {}
+        chain.append(view_name)
+        fields = {}
+        # Późniejsze widoki z listy extends i pola samego widoku nadpisują wcześniejsze
+        for parent in view['extends']:
+            if parent in self.views:
+                fields.update(self._inherited_fields(parent, closures, chain))
+        chain.pop()
+        fields.update(view['fields'])
+        closures[view_name] = fields
+        return fields
+
+    @property
+    def column_index(self):
+        if self._column_index is None:
+            self._build_column_index()
+        return self._column_index
+
+    def _build_column_index(self):
+        # Budowany raz na przebieg; zbiory kolumn widoków liczone tylko tu, a nie dla każdej tabeli
+        self._view_names = list(self.columns)
+        self._column_sets = {view_name: set(columns.keys()) for view_name, columns in self.columns.items()}
+        # Kandydaci do extends wybierani po własnych polach widoku - pola odziedziczone przez extends
+        # (np. z _base_tech) nie dopasowują tabeli do każdego widoku potomnego
+        index = {}
+        for position, view_name in enumerate(self._view_names):
+            for column in self.views[view_name]['fields']:
+                index.setdefault(column, []).append(position)
+        self._column_index = index
+
+    def matching_views(self, table_columns):
+        # Widoki bazowe, których własne pola obejmują choć jedną kolumnę tabeli - w kolejności widoków
+        index = self.column_index
+        positions = {position for column in table_columns for position in index.get(column, ())}
+        return [self._view_names[position] for position in sorted(positions)]
+
+    def column_set(self, view_name):
+        self.column_index
+        return self._column_sets[view_name]
+
+    def match_table(self, table_columns):
+        # Widoki do extends, kolumny tabeli obecne w tych widokach i brakujące kolumny widoków (ukryte pola) -
+        # dwa ostatnie razem z polami odziedziczonymi
+        extends_views = []
+        commented = set()
+        missing = {}
+        for view_name in self.matching_views(table_columns):
+            base_column_names = self.column_set(view_name)
+            extends_views.append(view_name)
+            commented.update(base_column_names.intersection(table_columns))
+            for col_name in base_column_names - table_columns:
+                missing[col_name] = self.columns[view_name][col_name]
+        return BaseMatch(extends_views, commented, missing)
+
+    @property
+    def key(self):
+        return _registry_key(self.path, self.recursive, self.include, self.exclude)
+
+    def include_path(self, view_name):
+        # Ścieżka include w wygenerowanym widoku - z zachowaniem podkatalogu widoku bazowego
+        view = self.views.get(view_name)
+        return f"/datasets/_base/views/{view['file'] if view else view_name + '.view.lkml'}"
+
+    def load(self):
+        # Wczytanie od razu - np. przed przekazaniem rejestru do procesów roboczych
+        self.column_index
+        return self
+
+    def __repr__(self):
+        state = 'niewczytany' if self._views is None else f"widoki: {len(self._views)}"
+        return f"BaseViewRegistry({self.path!r}, {state})"
+
+# Rejestry wczytane w tym procesie, wg ścieżki katalogu i ustawień przeglądania
+_base_view_registries = {}
+
+def _registry_key(path, recursive=False, include=None, exclude=None):
+    return (os.path.abspath(path), recursive, tuple(include or ()), tuple(exclude or ()))
+
+def get_base_view_registry(path=BASE_VIEWS_PATH, cache_dir=None, recursive=False, include=None, exclude=None):
+    key = _registry_key(path, recursive, include, exclude)
+    if key not in _base_view_registries:
+        _base_view_registries[key] = BaseViewRegistry(path, cache_dir=cache_dir, recursive=recursive, include=include, exclude=exclude)
+    return _base_view_registries[key]
+
+class BitmaskMatcher:
+    # Dopasowanie wielu tabel naraz: każda kolumna wspólna dla tabel i widoków bazowych ma swój bit,
+    # a tabele i widoki są maskami (liczby całkowite Pythona). Z use_numpy maski to wiersze słów uint64
+    # i iloczyny liczone są dla wszystkich par tabela/widok jednocześnie. Brakujące kolumny widoku są
+    # zwracane w kolejności deklaracji w widoku, a nie w kolejności iteracji zbioru
+
+    def __init__(self, registry, use_numpy=False):
+        self.registry = registry
+        self.use_numpy = use_numpy
+
+    @staticmethod
+    def _mask(columns, bits):
+        mask = 0
+        for column in columns:
+            bit = bits.get(column)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    @staticmethod
+    def _columns(mask, names):
+        found = []
+        while mask:
+            low = mask & -mask
+            found.append(names[low.bit_length() - 1])
+            mask ^= low
+        return found
+
+    def _match_pairs(self, table_masks, view_masks, bit_count):
+        # Pary (numer tabeli, numer widoku) z niepustym iloczynem masek, w kolejności tabel i widoków
+        if not self.use_numpy:
+            return [(i, j) for i, table_mask in enumerate(table_masks) if table_mask
+                    for j, view_mask in enumerate(view_masks) if view_mask & table_mask]
+        import numpy as np
+        words = max(1, (bit_count + 63) // 64)
+        def to_words(masks):
+            return np.array([[(mask >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(words)] for mask in masks],
+                            dtype=np.uint64).reshape(len(masks), words)
+        tables = to_words(table_masks)
+        views = to_words(view_masks)
+        pairs = []
+        # Tabele w porcjach - tablica tabela x widok x słowo ograniczona do ok. 8 mln słów
+        chunk = max(1, 8_000_000 // max(1, len(view_masks) * words))
+        for start in range(0, len(table_masks), chunk):
+            hits = (tables[start:start + chunk, None, :] & views[None, :, :]).any(axis=2)
+            rows, cols = np.nonzero(hits)
+            pairs.extend(zip((rows + start).tolist(), cols.tolist()))
+        return pairs
+
+    def match_tables(self, tables_columns):
+        # Lista BaseMatch dla kolejnych tabel (zbiory nazw kolumn w wielkich literach)
+        base_columns = self.registry.columns
+        view_names = list(base_columns)
+        view_columns = list(base_columns.values())
+        index = self.registry.column_index
+        bits = {}
+        for columns in tables_columns:
+            for column in columns:
+                if column in index:
+                    bits.setdefault(column, len(bits))
+        names = list(bits)
+        table_masks = [self._mask(columns, bits) for columns in tables_columns]
+        view_masks = [self._mask(columns, bits) for columns in view_columns]
+        # Pary wybierane po własnych polach widoków, część wspólna i brakujące kolumny - z odziedziczonymi
+        own_masks = [self._mask(self.registry.views[view_name]['fields'], bits) for view_name in view_names]
+        results = [BaseMatch([], set(), {}) for _ in tables_columns]
+        for i, j in self._match_pairs(table_masks, own_masks, len(bits)):
+            result = results[i]
+            common = self._columns(view_masks[j] & table_masks[i], names)
+            result.extends_views.append(view_names[j])
+            result.commented.update(common)
+            # Brakujące kolumny = kolumny widoku spoza części wspólnej
+            columns = view_columns[j]
+            common = set(common)
+            for col_name in columns:
+                if col_name not in common:
+                    result.missing[col_name] = columns[col_name]
+        return results
+
+MATCH_ENGINES = ('sets', 'bitmask', 'bitmask_numpy')
+
+def _as_registry(registry):
+    # Rejestr, słownik widok -> kolumny albo None (domyślny rejestr procesu)
+    if registry is None:
+        return get_base_view_registry()
+    if isinstance(registry, BaseViewRegistry):
+        return registry
+    return BaseViewRegistry(columns=registry)
 
 predefined_columns = {}
 
-def _get_column_data(row):
-    return {
-        'column_name': row['COLUMN NAME'].lower(),
-        'description': row['DESCRIPTION'].replace('"', "''"),
-        'data_type': row['TYPE'].lower(),
-        'label': row['LABEL'],
-        'group_label': row['GROUP_LABEL']
-    }
+# Dane jednej kolumny specyfikacji używane przy generowaniu widoku
+ColumnSpec = namedtuple('ColumnSpec', ['column_name', 'description', 'data_type', 'label', 'group_label'])
+
+def _column_raw_values(block, column):
+    if isinstance(block, list):
+        return [record.get(column) for record in block]
+    if column not in block.columns:
+        return None
+    return block[column].tolist()
+
+def _column_values(df, column):
+    if isinstance(df, list):
+        # Blok jako lista rekordów (ścieżka bez pandas)
+        return ['' if _is_blank(record.get(column)) else record.get(column) for record in df]
+    import pandas as pd
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    return values.fillna('').tolist()
+
+def build_column_specs(df):
+    # Cały blok naraz - kolumny jako listy, posortowane po COLUMN NAME
+    rows = sorted(zip(*(_column_values(df, column) for column in ['COLUMN NAME', 'DESCRIPTION', 'TYPE', 'LABEL', 'GROUP_LABEL'])),
+                  key=itemgetter(0))
+    return [ColumnSpec(column_name.lower(), sys.intern(description.replace('"', "''")), sys.intern(data_type.lower()), label, group_label)
+            for column_name, description, data_type, label, group_label in rows]
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+def _intern_frame(df):
+    import pandas as pd
+    for column in INTERNED_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = [_intern(value) for value in df[column].tolist()]
+    return df
+
+def string_memory_stats(datasets, stats=None):
+    # Pamięć tekstów w kolumnach INTERNED_COLUMNS: ile zajmują faktycznie (unikalne obiekty)
+    # i ile zajmowałyby, gdyby każda komórka miała własną kopię
+    stats = stats if stats is not None else {'cells': 0, 'copied_bytes': 0, 'objects': {}}
+    for block in datasets:
+        for column in INTERNED_COLUMNS:
+            for value in (_column_raw_values(block, column) or []):
+                if type(value) is str:
+                    size = sys.getsizeof(value)
+                    stats['cells'] += 1
+                    stats['copied_bytes'] += size
+                    stats['objects'].setdefault(id(value), (value, size))
+    return stats
+
+def print_string_memory_report(stats):
+    unique_bytes = sum(size for _, size in stats['objects'].values())
+    saved = stats['copied_bytes'] - unique_bytes
+    print(f"Teksty: komórki: {stats['cells']}, obiekty str: {len(stats['objects'])}, "
+          f"pamięć: {unique_bytes / 2**20:.2f} MB zamiast {stats['copied_bytes'] / 2**20:.2f} MB "
+          f"(oszczędność {saved / 2**20:.2f} MB)")
+
+# Teksty traktowane przez pd.read_excel / pd.read_csv jako brak wartości (domyślne na_values pandas).
+# Czytniki wierszowe stosują tę samą regułę, więc każda ścieżka dzieli arkusz na te same bloki
+NA_VALUES = frozenset(['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                       '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
+
+def _is_blank(value):
+    if type(value) is str:
+        return value in NA_VALUES
+    return value is None or (isinstance(value, float) and value != value)
+
+def _cell_value(row, i, intern=False):
+    # Wartość komórki jak w DataFrame z pandas: brak (także tekst z NA_VALUES) jako None
+    if i >= len(row) or _is_blank(row[i]):
+        return None
+    return _intern(row[i]) if intern else row[i]
+
+def _iter_row_blocks(rows, columns=None, skip_first_row=True):
+    # rows - krotki wartości kolejnych wierszy arkusza, tak jak zwraca openpyxl (values_only)
+    # columns - opcjonalna lista kolumn nagłówka, które mają zostać zachowane
+    rows = iter(rows)
+    # Pierwszy wiersz arkusza pd.read_excel traktuje jako nagłówek i jest on pomijany
+    if skip_first_row:
+        next(rows, None)
+    header = None
+    keep = []
+    id_pos = None
+    current_dataset = []
+    for row in rows:
+        # Pomiń puste wiersze
+        if all(_is_blank(value) for value in row):
+            continue
+        # Pierwszy niepusty wiersz to właściwy nagłówek
+        if header is None:
+            keep = [i for i, value in enumerate(row) if not _is_blank(value) and (columns is None or value in columns)]
+            header = [row[i] for i in keep]
+            id_pos = header.index('ID')
+            interned = [name in INTERNED_COLUMNS for name in header]
+            continue
+        values = tuple(_cell_value(row, i, intern) for i, intern in zip(keep, interned))
+        if _is_blank(values[id_pos]):
+            if current_dataset:
+                yield header, current_dataset
+                current_dataset = []
+        else:
+            current_dataset.append(values)
+
+    if current_dataset:
+        yield header, current_dataset
+
+def _iter_openpyxl_rows(file_path, sheet_name=0):
+    import openpyxl
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+def _iter_csv_rows(file_path, sheet_name=0):
+    # Plik CSV ma zawsze jeden arkusz; puste pola traktowane jak puste komórki, a teksty z NA_VALUES
+    # zamieniane na None przy dzieleniu na bloki - tak jak pd.read_csv w ścieżce z --parse_cache
+    delimiter = '\t' if file_path.lower().endswith('.tsv') else ','
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.reader(f, delimiter=delimiter):
+            yield tuple(value if value != '' else None for value in row)
+
+XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+XLSX_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+# Wbudowane formaty liczbowe Excela oznaczające datę lub czas
+XLSX_DATE_FORMAT_IDS = set(range(14, 23)) | {45, 46, 47}
+
+def _xlsx_sheet_names(file_path):
+    # Nazwy arkuszy w kolejności z xl/workbook.xml
+    with zipfile.ZipFile(file_path) as archive:
+        workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    return [sheet.get('name') for sheet in workbook.iter(f'{XLSX_NS}sheet')]
+
+def _xlsx_sheet_path(archive, sheet_name=0):
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    sheets = [(sheet.get('name'), sheet.get(f'{XLSX_REL_NS}id')) for sheet in workbook.iter(f'{XLSX_NS}sheet')]
+    if isinstance(sheet_name, int):
+        relation_id = sheets[sheet_name][1]
+    else:
+        relation_id = dict(sheets)[sheet_name]
+    relations = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    target = next(relation.get('Target') for relation in relations if relation.get('Id') == relation_id)
+    workbook_pr = workbook.find(f'{XLSX_NS}workbookPr')
+    date1904 = workbook_pr is not None and workbook_pr.get('date1904') in ('1', 'true')
+    epoch = datetime(1904, 1, 1) if date1904 else datetime(1899, 12, 30)
+    return (target[1:] if target.startswith('/') else f'xl/{target}'), epoch
+
+def _xlsx_shared_strings(archive):
+    strings = []
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return strings
+    with archive.open('xl/sharedStrings.xml') as f:
+        for _, elem in ElementTree.iterparse(f):
+            if elem.tag == f'{XLSX_NS}si':
+                # Tekst prosty (t) lub sformatowany (r/t), bez zapisu fonetycznego (rPh)
+                texts = elem.findall(f'{XLSX_NS}t') + elem.findall(f'{XLSX_NS}r/{XLSX_NS}t')
+                strings.append(''.join(t.text or '' for t in texts))
+                elem.clear()
+    return strings
+
+def _xlsx_date_styles(archive):
+    # Indeksy stylów komórek (atrybut s), których format liczbowy jest datą
+    if 'xl/styles.xml' not in archive.namelist():
+        return set()
+    styles = ElementTree.fromstring(archive.read('xl/styles.xml'))
+    date_formats = set(XLSX_DATE_FORMAT_IDS)
+    for number_format in styles.iter(f'{XLSX_NS}numFmt'):
+        code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', '', number_format.get('formatCode', ''))
+        if re.search(r'[dmyhs]', code, re.IGNORECASE):
+            date_formats.add(int(number_format.get('numFmtId')))
+    cell_formats = styles.find(f'{XLSX_NS}cellXfs')
+    if cell_formats is None:
+        return set()
+    return {i for i, xf in enumerate(cell_formats) if int(xf.get('numFmtId', 0)) in date_formats}
+
+def _xlsx_column_index(reference):
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index - 1
+
+def _iter_xlsx_rows(file_path, sheet_name=0):
+    # Minimalny czytnik xlsx: strumieniowe parsowanie XML arkusza z archiwum zip (bez openpyxl)
+    with zipfile.ZipFile(file_path) as archive:
+        sheet_path, epoch = _xlsx_sheet_path(archive, sheet_name)
+        date_styles = _xlsx_date_styles(archive)
+        # sharedStrings wczytywane dopiero przy pierwszej komórce, która ich potrzebuje
+        shared_strings = None
+        expected_row = 1
+        sheet_data = None
+        with archive.open(sheet_path) as f:
+            for event, elem in ElementTree.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == f'{XLSX_NS}sheetData':
+                        sheet_data = elem
+                    continue
+                if elem.tag != f'{XLSX_NS}row':
+                    continue
+                row_number = int(elem.get('r', expected_row))
+                # Wiersze pominięte w XML są puste
+                while expected_row < row_number:
+                    yield ()
+                    expected_row += 1
+                values = []
+                for cell in elem.iter(f'{XLSX_NS}c'):
+                    reference = cell.get('r')
+                    if reference:
+                        values.extend([None] * (_xlsx_column_index(reference) - len(values)))
+                    cell_type = cell.get('t', 'n')
+                    value = None
+                    if cell_type == 'inlineStr':
+                        value = ''.join(t.text or '' for t in cell.iter(f'{XLSX_NS}t'))
+                    else:
+                        v = cell.find(f'{XLSX_NS}v')
+                        text = v.text if v is not None else None
+                        if text is None:
+                            pass
+                        elif cell_type == 's':
+                            if shared_strings is None:
+                                shared_strings = _xlsx_shared_strings(archive)
+                            value = shared_strings[int(text)]
+                        elif cell_type in ('str', 'e'):
+                            value = text
+                        elif cell_type == 'b':
+                            value = text == '1'
+                        elif cell_type == 'd':
+                            value = datetime.fromisoformat(text)
+                        else:
+                            number = float(text)
+                            if cell.get('s') is not None and int(cell.get('s')) in date_styles:
+                                value = epoch + timedelta(days=number)
+                            else:
+                                value = int(number) if number.is_integer() else number
+                    values.append(value)
+                yield tuple(values)
+                expected_row = row_number + 1
+                # Zwolnienie przetworzonych elementów
+                elem.clear()
+                if sheet_data is not None:
+                    sheet_data.clear()
+
+def has_row_reader(file_path, reader=None):
+    # Czy arkusz można czytać wierszami - .ods i .xls są czytane tylko w całości jako DataFrame
+    return (READER_BACKENDS[select_reader(file_path, reader)][3] is not None
+            or os.path.splitext(file_path)[1].lower() in READER_BACKENDS['xlsx_native'][1])
+
+def _row_reader(file_path, reader=None):
+    if not has_row_reader(file_path, reader):
+        raise ValueError(f"Brak backendu czytającego wiersze dla pliku {file_path}")
+    # Backend bez czytania wierszy (np. calamine) - dla xlsx używamy wbudowanego czytnika
+    return READER_BACKENDS[select_reader(file_path, reader)][3] or _iter_xlsx_rows
+
+def iter_record_blocks(file_path, reader=None, sheet_name=0, columns=None):
+    # Bloki jako listy rekordów (dict), bez budowania DataFrame i bez importu pandas
+    row_reader = _row_reader(file_path, reader)
+    for header, rows in _iter_row_blocks(row_reader(file_path, sheet_name), columns):
+        yield [dict(zip(header, values)) for values in rows]
+
+def _iter_jsonl_blocks(lines, columns=None):
+    # Każda linia to rekord JSON; rekord bez ID zamyka bieżący blok
+    current_dataset = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if columns is not None:
+            record = {column: record.get(column) for column in columns}
+        for column in INTERNED_COLUMNS:
+            if column in record:
+                record[column] = _intern(record[column])
+        if _is_blank(record.get('ID')):
+            if current_dataset:
+                yield current_dataset
+                current_dataset = []
+        else:
+            current_dataset.append(record)
+
+    if current_dataset:
+        yield current_dataset
+
+def _rows_fingerprint(table_name, header, values):
+    # Wartości sprowadzone do tekstu, aby odcisk nie zależał od postaci bloku (DataFrame / rekordy)
+    values = [[None if _is_blank(value) else str(value) for value in row] for row in values]
+    rows = json.dumps([str(table_name), header, values], ensure_ascii=False)
+    return hashlib.sha256(rows.encode()).hexdigest()
+
+def _finish_table_range(table_range, rows, keep, names):
+    # Do zakresu dopisywany jest odcisk wierszy i nazwy kolumn - tabelę można pominąć bez czytania jej wierszy
+    if table_range is None:
+        return
+    values = [[_cell_value(row, i) for i in keep] for row in rows]
+    table_range.append(_rows_fingerprint(values[0][names.index('TABLE NAME')], names, values))
+    column_pos = names.index('COLUMN NAME')
+    table_range.append(sorted({str(row[column_pos]).upper() for row in values if not _is_blank(row[column_pos])}))
+
+def scan_table_index(file_path, reader=None, sheet_name=0):
+    # Lekki przegląd arkusza: numery wierszy (od 1) nagłówka i zakresy wierszy każdej tabeli
+    # Zakres: [pierwszy wiersz, ostatni wiersz, odcisk wierszy, nazwy kolumn]
+    header_row = None
+    header = []
+    tables = {}
+    current_range = None
+    current_rows = []
+    for row_number, row in enumerate(_row_reader(file_path, reader)(file_path, sheet_name), start=1):
+        # Pierwszy wiersz arkusza i puste wiersze są pomijane, jak przy pełnym czytaniu
+        if row_number == 1 or all(_is_blank(value) for value in row):
+            continue
+        if header_row is None:
+            header_row = row_number
+            header = [None if _is_blank(value) else value for value in row]
+            id_pos = header.index('ID')
+            name_pos = header.index('TABLE NAME')
+            keep = [i for i, value in enumerate(header) if value is not None]
+            names = [header[i] for i in keep]
+            continue
+        if id_pos >= len(row) or _is_blank(row[id_pos]):
+            _finish_table_range(current_range, current_rows, keep, names)
+            current_range = None
+        elif current_range is None:
+            current_range = [row_number, row_number]
+            current_rows = [row]
+            tables.setdefault(str(row[name_pos]), []).append(current_range)
+        else:
+            current_range[1] = row_number
+            current_rows.append(row)
+    if header_row is not None:
+        _finish_table_range(current_range, current_rows, keep, names)
+    return {'header_row': header_row, 'header': header, 'tables': tables}
+
+def _table_index_path(file_path):
+    return f"{file_path}.index.json"
+
+def load_table_index(file_path, reader=None, sheet_name=0):
+    # Indeks zapisywany obok skoroszytu, unieważniany po zmianie rozmiaru/daty pliku lub wersji generatora
+    index_path = _table_index_path(file_path)
+    stat = os.stat(file_path)
+    key = {'version': __version__, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    index = None
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            # Przerwany zapis albo uszkodzony plik - arkusz jest skanowany ponownie, a indeks nadpisany
+            print(f"Pominięto indeks {index_path}: {e}")
+    if not isinstance(index, dict) or index.get('key') != key or not isinstance(index.get('sheets'), dict):
+        index = {'key': key, 'sheets': {}}
+    entry = index['sheets'].get(str(sheet_name))
+    if entry is None:
+        entry = scan_table_index(file_path, reader, sheet_name)
+        index['sheets'][str(sheet_name)] = entry
+        try:
+            tmp_path = index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"Nie zapisano indeksu {index_path}: {e}")
+    return entry
+
+class LazyWorkbook:
+    # Wspólny kursor wierszy arkusza dla leniwych datasetów - zakresy czytane po kolei kosztują jedno przejście
+
+    def __init__(self, file_path, reader=None, sheet_name=0, columns=None):
+        self.file_path = file_path
+        self.reader = reader
+        self.sheet_name = sheet_name
+        self.entry = load_table_index(file_path, reader, sheet_name)
+        header = self.entry['header']
+        self.keep = [i for i, value in enumerate(header) if value is not None and (columns is None or value in columns)]
+        self.names = [header[i] for i in self.keep]
+        self.rows = None
+        self.row_number = 0
+
+    def read_range(self, first_row, last_row):
+        # Zakres przed bieżącą pozycją kursora wymaga czytania arkusza od początku
+        if self.rows is None or first_row <= self.row_number:
+            self.close()
+            self.rows = _row_reader(self.file_path, self.reader)(self.file_path, self.sheet_name)
+        block = []
+        for row in self.rows:
+            self.row_number += 1
+            if self.row_number < first_row:
+                continue
+            if not all(_is_blank(value) for value in row):
+                block.append({name: _cell_value(row, i, name in INTERNED_COLUMNS) for name, i in zip(self.names, self.keep)})
+            if self.row_number == last_row:
+                break
+        return block
+
+    def close(self):
+        if self.rows is not None:
+            self.rows.close()
+            self.rows = None
+        self.row_number = 0
+
+class DatasetHandle:
+    # Leniwy dataset: nazwa tabeli i zakres wierszy z indeksu; wiersze czytane dopiero przy materialize()
+
+    def __init__(self, workbook, table_name, table_range):
+        self.workbook = workbook
+        self.table_name = table_name
+        self.first_row, self.last_row, self.rows_hash, self.column_names = table_range
+
+    def materialize(self):
+        return self.workbook.read_range(self.first_row, self.last_row)
+
+    def __repr__(self):
+        return f"DatasetHandle({self.table_name!r}, wiersze {self.first_row}-{self.last_row})"
+
+def _materialize(block):
+    return block.materialize() if isinstance(block, DatasetHandle) else block
+
+def load_lazy_datasets(file_path, reader=None, sheet_name=0, columns=None, tables=None):
+    # Uchwyty datasetów w kolejności arkusza (opcjonalnie tylko wybrane tabele)
+    workbook = LazyWorkbook(file_path, reader, sheet_name, columns)
+    table_ranges = workbook.entry['tables']
+    wanted = None
+    if tables:
+        wanted = {str(table).upper() for table in tables}
+        for table in sorted(wanted - {name.upper() for name in table_ranges}):
+            print(f"Brak tabeli w skoroszycie: {table}")
+    handles = [DatasetHandle(workbook, name, table_range) for name, ranges in table_ranges.items()
+               if wanted is None or name.upper() in wanted for table_range in ranges]
+    return sorted(handles, key=lambda handle: handle.first_row)
+
+def iter_table_blocks(file_path, tables, reader=None, sheet_name=0, columns=None):
+    # Czyta tylko zakresy wierszy wybranych tabel (wg indeksu) i kończy po ostatnim z nich
+    handles = load_lazy_datasets(file_path, reader, sheet_name, columns, tables)
+    try:
+        for handle in handles:
+            yield handle.materialize()
+    finally:
+        if handles:
+            handles[0].workbook.close()
+
+def select_table_blocks(datasets, tables):
+    # Wybrane tabele spośród wczytanych bloków - gdy arkusza nie da się czytać zakresami wierszy
+    wanted = {str(table).upper() for table in tables}
+    selected = [block for block in datasets if str(_block_table_name(block)).upper() in wanted]
+    for table in sorted(wanted - {str(_block_table_name(block)).upper() for block in selected}):
+        print(f"Brak tabeli w skoroszycie: {table}")
+    return selected
+
+STDIN_FORMATS = ('csv', 'tsv', 'jsonl')
+
+def iter_stdin_blocks(stdin_format='csv', columns=None, stream=None):
+    # Specyfikacja ze standardowego wejścia - blok jest zwracany, gdy tylko nadejdzie jego separator.
+    # W CSV/TSV pierwsza linia jest nagłówkiem (bez wiersza tytułowego arkusza)
+    stream = sys.stdin if stream is None else stream
+    if stdin_format == 'jsonl':
+        yield from _iter_jsonl_blocks(stream, columns)
+        return
+    rows = csv.reader(stream, delimiter='\t' if stdin_format == 'tsv' else ',')
+    rows = (tuple(value if value != '' else None for value in row) for row in rows)
+    for header, block_rows in _iter_row_blocks(rows, columns, skip_first_row=False):
+        yield [dict(zip(header, values)) for values in block_rows]
+
+def _block_table_name(block):
+    if isinstance(block, DatasetHandle):
+        return block.table_name
+    if isinstance(block, list):
+        return block[0]['TABLE NAME']
+    return block['TABLE NAME'].iloc[0]
+
+def _block_column_names(block):
+    if isinstance(block, DatasetHandle):
+        return set(block.column_names)
+    if isinstance(block, list):
+        return {str(record['COLUMN NAME']).upper() for record in block if not _is_blank(record.get('COLUMN NAME'))}
+    return set(block['COLUMN NAME'].str.upper().tolist())
+
+def _block_records(block):
+    block = _materialize(block)
+    if isinstance(block, list):
+        return block
+    return block.to_dict(orient='records')
+
+def iter_excel_blocks(file_path, sheet_name=0, columns=None, reader=None):
+    # Strumieniowe czytanie arkusza - zwraca po jednym bloku (datasecie) naraz
+    import pandas as pd
+    for header, rows in _iter_row_blocks(_row_reader(file_path, reader)(file_path, sheet_name), columns):
+        yield pd.DataFrame(rows, columns=header)
+
+def _categorize(df):
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+def read_projected_datasets(file_path, sheet_name=0, columns=SPEC_COLUMNS, reader=None):
+    # Czytanie strumieniowe tylko wybranych kolumn - puste wiersze i separatory
+    # rozpoznawane są nadal po całym wierszu arkusza
+    import pandas as pd
+    header = None
+    rows = []
+    block_sizes = []
+    for header, block_rows in _iter_row_blocks(_row_reader(file_path, reader)(file_path, sheet_name), columns):
+        rows.extend(block_rows)
+        block_sizes.append(len(block_rows))
+    if header is None:
+        return []
+    df = _categorize(pd.DataFrame(rows, columns=header))
+    del rows
+    datasets = []
+    start = 0
+    for size in block_sizes:
+        datasets.append(df.iloc[start:start + size])
+        start += size
+    return datasets
+
+def _read_with_openpyxl(file_path, sheet_name=0):
+    import pandas as pd
+    return pd.read_excel(file_path, engine='openpyxl', sheet_name=sheet_name)
+
+def _read_with_calamine(file_path, sheet_name=0):
+    import pandas as pd
+    return pd.read_excel(file_path, engine='calamine', sheet_name=sheet_name)
+
+def _read_with_xlsx_native(file_path, sheet_name=0):
+    # Wiersze przechodzą przez ten sam parser co w pd.read_excel: pierwszy wiersz arkusza jest nagłówkiem,
+    # a puste teksty ('') i domyślne oznaczenia braków ('NA', 'N/A', ...) stają się NaN
+    from pandas.io.parsers import TextParser
+    # Puste komórki jako '' i wiersze dopełnione do szerokości arkusza, jak w czytnikach pandas
+    rows = [['' if value is None else value for value in row] for row in _iter_xlsx_rows(file_path, sheet_name)]
+    width = max((len(row) for row in rows), default=0)
+    return TextParser([row + [''] * (width - len(row)) for row in rows], header=0).read()
+
+def _read_with_odf(file_path, sheet_name=0):
+    import pandas as pd
+    return pd.read_excel(file_path, engine='odf', sheet_name=sheet_name)
+
+def _read_with_csv(file_path, sheet_name=0):
+    # Plik CSV ma zawsze jeden arkusz
+    import pandas as pd
+    sep = '\t' if file_path.lower().endswith('.tsv') else ','
+    return pd.read_csv(file_path, sep=sep)
+
+# Backendy czytające arkusz, w kolejności od najszybszego
+# nazwa: (wymagany moduł, obsługiwane rozszerzenia, funkcja czytająca DataFrame, funkcja czytająca wiersze)
+READER_BACKENDS = {
+    'calamine': ('python_calamine', ('.xlsx', '.xlsm', '.xls', '.ods'), _read_with_calamine, None),
+    'xlsx_native': (None, ('.xlsx', '.xlsm'), _read_with_xlsx_native, _iter_xlsx_rows),
+    'openpyxl': ('openpyxl', ('.xlsx', '.xlsm'), _read_with_openpyxl, _iter_openpyxl_rows),
+    'odf': ('odf', ('.ods',), _read_with_odf, None),
+    'csv': (None, ('.csv', '.tsv'), _read_with_csv, _iter_csv_rows),
+}
+
+SPEC_EXTENSIONS = tuple(sorted({ext for _, extensions, _, _ in READER_BACKENDS.values() for ext in extensions}))
+
+def _strip_spec_extension(name):
+    root, ext = os.path.splitext(name)
+    return root if ext.lower() in SPEC_EXTENSIONS else name
+
+def available_readers():
+    return [name for name, (module, _, _, _) in READER_BACKENDS.items()
+            if module is None or importlib.util.find_spec(module) is not None]
+
+def select_reader(file_path, reader=None):
+    ext = os.path.splitext(file_path)[1].lower()
+    available = available_readers()
+    if reader is not None:
+        if reader not in READER_BACKENDS:
+            raise ValueError(f"Nieznany backend: {reader}. Dostępne: {', '.join(READER_BACKENDS)}")
+        if reader not in available:
+            raise ValueError(f"Backend {reader} wymaga modułu {READER_BACKENDS[reader][0]}, który nie jest zainstalowany")
+        return reader
+    for name in available:
+        if ext in READER_BACKENDS[name][1]:
+            return name
+    raise ValueError(f"Brak dostępnego backendu dla plików {ext}")
+
+def list_sheets(file_path, reader=None):
+    reader = select_reader(file_path, reader)
+    if reader == 'csv':
+        return [0]
+    if reader == 'xlsx_native':
+        return _xlsx_sheet_names(file_path)
+    import pandas as pd
+    with pd.ExcelFile(file_path, engine=reader) as workbook:
+        return workbook.sheet_names
+
+def read_excel_datasets(file_path, reader=None, sheet_name=0, columns=None):
+    reader = select_reader(file_path, reader)
+    if columns is not None and READER_BACKENDS[reader][3] is not None:
+        return read_projected_datasets(file_path, sheet_name, columns, reader)
 
-def clean_excel_file(file_path,model_name, generate_lookml, save_datasets, generate_connections, output_dir):
-    # Get file name (dataset name)
-    dataset_name = os.path.basename(file_path).replace(".xlsx","")
     # Load the Excel file
-    df = pd.read_excel(file_path, engine='openpyxl')
+    df = READER_BACKENDS[reader][2](file_path, sheet_name)
     
     # Drop blank rows
     df.dropna(how='all', inplace=True)
@@ -47,23 +1083,408 @@ def clean_excel_file(file_path,model_name, generate_lookml, save_datasets, gener
     
     # Inicjalizacja zmiennych
     df = df.drop(df.columns[df.columns.isna()],axis = 1)
+
+    if columns is not None:
+        df = _categorize(df[[c for c in df.columns if c in columns]])
+    df = _intern_frame(df)
     
-    datasets = []
-    current_dataset = []
-    
-    
-    # Iteracja przez każdy wiersz w DataFrame
-    for index, row in df.iterrows():
-        if pd.isna(row['ID']):
-            if current_dataset:
-                datasets.append(pd.DataFrame(current_dataset))
-                
-                current_dataset = []
+    return segment_datasets(df)
+
+def segment_datasets(df):
+    # Wiersze z pustym ID rozdzielają datasety - etykietą bloku jest liczba separatorów przed wierszem
+    is_separator = df['ID'].isna()
+    block_labels = is_separator.cumsum()[~is_separator]
+    rows = df[~is_separator]
+    return [block.infer_objects() for _, block in rows.groupby(block_labels, sort=False)]
+
+def _file_hash(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def _parse_cache_path(file_path, cache_dir, reader=None, sheet_name=0, columns=None):
+    # Klucz: zawartość skoroszytu + wersja generatora i pandas (format pickle) + backend czytający + arkusz + kolumny
+    import pandas as pd
+    reader = select_reader(file_path, reader)
+    key = hashlib.sha256(f"{_file_hash(file_path)}:{__version__}:{pd.__version__}:{reader}:{sheet_name}:{columns}".encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+def load_cached_datasets(file_path, cache_dir=PARSE_CACHE_DIR, max_cache_mb=None, reader=None, sheet_name=0, columns=None):
+    cache_path = _parse_cache_path(file_path, cache_dir, reader, sheet_name, columns)
+    # W trybie wsadowym inne procesy mogą w tym czasie usunąć wpis (przycinanie) - brak pliku to brak wpisu
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                datasets = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # Uszkodzony wpis albo zapisany przez niezgodną wersję bibliotek - usuń i sparsuj ponownie
+            print(f"Pominięto wpis cache {cache_path}: {e}")
+            _remove_cache_file(cache_path)
         else:
-            current_dataset.append(row)
-    
+            # Odświeżenie czasu dostępu - przy przycinaniu usuwane są najstarsze wpisy
+            try:
+                os.utime(cache_path)
+            except FileNotFoundError:
+                pass
+            print(f"Wczytano z cache: {cache_path}")
+            return datasets
+
+    datasets = read_excel_datasets(file_path, reader, sheet_name, columns)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Własny plik tymczasowy - skoroszyty o tej samej treści zapisują równolegle ten sam wpis
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        pickle.dump(datasets, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    if max_cache_mb is not None:
+        prune_parse_cache(cache_dir, max_cache_mb)
+    return datasets
+
+def _remove_cache_file(path):
+    # Wpis mógł już usunąć inny proces
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def prune_parse_cache(cache_dir, max_cache_mb):
+    entries = []
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith('.pkl'):
+            try:
+                stat = os.stat(os.path.join(cache_dir, file_name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_name))
+    total_size = sum(size for _, size, _ in entries)
+    # Usuń najdawniej używane wpisy, aż cache zmieści się w limicie
+    for _, size, file_name in sorted(entries):
+        if total_size <= max_cache_mb * 1024 * 1024:
+            break
+        _remove_cache_file(os.path.join(cache_dir, file_name))
+        total_size -= size
+
+def clear_parse_cache(cache_dir=PARSE_CACHE_DIR, file_path=None, reader=None, sheet_name=0, columns=None):
+    if not os.path.isdir(cache_dir):
+        return
+    if file_path is not None:
+        _remove_cache_file(_parse_cache_path(file_path, cache_dir, reader, sheet_name, columns))
+        return
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith('.pkl'):
+            _remove_cache_file(os.path.join(cache_dir, file_name))
+
+def benchmark_readers(file_path, repeat=3):
+    # Porównanie dostępnych backendów na tym samym pliku (czytanie + segmentacja)
+    ext = os.path.splitext(file_path)[1].lower()
+    results = {}
+    for name in available_readers():
+        if ext not in READER_BACKENDS[name][1]:
+            continue
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            datasets = read_excel_datasets(file_path, name)
+            timings.append(time.perf_counter() - start)
+        results[name] = (min(timings), len(datasets))
+        print(f"{name:<12} {min(timings):8.3f}s  datasety: {len(datasets)}")
+    return results
+
+def load_datasets(file_path, stream=False, cache_dir=None, max_cache_mb=None, reader=None, sheet_name=0, columns=None,
+                  stdin_format='csv', tables=None, lazy=False):
+    if file_path == '-':
+        return iter_stdin_blocks(stdin_format, columns)
+    if (lazy or tables or stream) and not has_row_reader(file_path, reader):
+        # Brak czytnika wierszy (.ods, .xls) - arkusz wczytywany w całości, wybrane tabele filtrowane po wczytaniu
+        print(f"Plik {file_path} czytany w całości (backend {select_reader(file_path, reader)} nie czyta wierszy)")
+        if cache_dir:
+            datasets = load_cached_datasets(file_path, cache_dir, max_cache_mb, reader, sheet_name, columns)
+        else:
+            datasets = read_excel_datasets(file_path, reader, sheet_name, columns)
+        return select_table_blocks(datasets, tables) if tables else datasets
+    if lazy:
+        # Uchwyty (nazwa tabeli + zakres wierszy) zamiast wczytanych bloków
+        return load_lazy_datasets(file_path, reader, sheet_name, columns, tables)
+    if tables:
+        return iter_table_blocks(file_path, tables, reader, sheet_name, columns)
+    if select_reader(file_path, reader) == 'csv' and not cache_dir:
+        # CSV/TSV czytany modułem csv - strumieniowo i bez pandas
+        return iter_record_blocks(file_path, 'csv', sheet_name, columns)
+    if stream:
+        # Bloki są generowane w trakcie czytania arkusza
+        return iter_excel_blocks(file_path, sheet_name, columns, reader)
+    if cache_dir:
+        return load_cached_datasets(file_path, cache_dir, max_cache_mb, reader, sheet_name, columns)
+    return read_excel_datasets(file_path, reader, sheet_name, columns)
+
+def _manifest_path(output_dir, model_name):
+    return os.path.join(output_dir, _strip_spec_extension(model_name), MANIFEST_FILE)
+
+def load_manifest(output_dir, model_name):
+    manifest_path = _manifest_path(output_dir, model_name)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        # Zmiana wersji generatora unieważnia cały manifest
+        if manifest.get('version') == __version__:
+            return manifest
+    return {'version': __version__, 'blocks': {}}
+
+def save_manifest(manifest, output_dir, model_name):
+    manifest_path = _manifest_path(output_dir, model_name)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+
+def block_fingerprint(df, registry):
+    if isinstance(df, DatasetHandle):
+        # Odcisk wierszy z indeksu skoroszytu - bez czytania wierszy tabeli
+        rows_hash = df.rows_hash
+    elif isinstance(df, list):
+        header = list(df[0].keys())
+        values = [[record.get(c) for c in header] for record in df]
+    else:
+        header = [str(c) for c in df.columns]
+        values = df.values.tolist()
+    if not isinstance(df, DatasetHandle):
+        rows_hash = _rows_fingerprint(_block_table_name(df), header, values)
+    df_columns = _block_column_names(df)
+    # Odciski widoków bazowych, które pasują do kolumn tabeli - razem z plikiem widoku, bo przeniesienie
+    # widoku do innego podkatalogu zmienia ścieżkę include: w wygenerowanym widoku
+    registry = _as_registry(registry)
+    bases = {view_name: hashlib.sha256(json.dumps([registry.views[view_name]['file'],
+                                                   sorted(registry.columns[view_name].items())]).encode()).hexdigest()
+             for view_name in registry.matching_views(df_columns)}
+    return {'rows': rows_hash, 'bases': bases}
+
+SPEC_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spec_columns (
+    dataset TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    type TEXT,
+    description TEXT,
+    label TEXT,
+    group_label TEXT,
+    record TEXT NOT NULL,
+    PRIMARY KEY (dataset, table_name, column_name)
+);
+CREATE INDEX IF NOT EXISTS spec_columns_column_name ON spec_columns (column_name);
+"""
+
+def open_spec_store(db_path):
+    import sqlite3
+    connection = sqlite3.connect(db_path, timeout=30)
+    # WAL - zatwierdzanie każdego bloku bez pełnego fsync, równoległe odczyty podczas zapisu
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SPEC_STORE_SCHEMA)
+    return connection
+
+def upsert_spec_store(connection, dataset_name, block):
+    # Jeden blok (tabela) w jednej transakcji; kolumny usunięte ze specyfikacji znikają ze store
+    table_name = str(_block_table_name(block))
+    rows = []
+    for position, record in enumerate(_block_records(block)):
+        column_name = '' if _is_blank(record.get('COLUMN NAME')) else str(record['COLUMN NAME']).upper()
+        values = [None if _is_blank(record.get(c)) else str(record.get(c)) for c in ['TYPE', 'DESCRIPTION', 'LABEL', 'GROUP_LABEL']]
+        rows.append((dataset_name, table_name, column_name, position, *values,
+                     json.dumps(record, default=str, ensure_ascii=False)))
+    with connection:
+        connection.executemany("""
+            INSERT INTO spec_columns (dataset, table_name, column_name, position, type, description, label, group_label, record)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (dataset, table_name, column_name) DO UPDATE SET
+                position = excluded.position, type = excluded.type, description = excluded.description,
+                label = excluded.label, group_label = excluded.group_label, record = excluded.record
+        """, rows)
+        placeholders = ', '.join('?' * len(rows))
+        connection.execute(f"DELETE FROM spec_columns WHERE dataset = ? AND table_name = ? AND column_name NOT IN ({placeholders})",
+                           [dataset_name, table_name, *(row[2] for row in rows)])
+
+def load_datasets_from_store(connection, dataset_name, tables=None):
+    # Bloki jako listy rekordów, odczytane zapytaniem po kluczu zamiast z pliku Excel
+    query = "SELECT table_name, record FROM spec_columns WHERE dataset = ?"
+    params = [dataset_name]
+    if tables:
+        query += f" AND upper(table_name) IN ({', '.join('?' * len(tables))})"
+        params.extend(str(table).upper() for table in tables)
+    current_table = None
+    current_dataset = []
+    for table_name, record in connection.execute(query + " ORDER BY table_name, position", params):
+        if table_name != current_table and current_dataset:
+            yield current_dataset
+            current_dataset = []
+        current_table = table_name
+        current_dataset.append(json.loads(record))
     if current_dataset:
-        datasets.append(pd.DataFrame(current_dataset))
+        yield current_dataset
+
+def find_tables_with_column(connection, column_name):
+    return connection.execute("SELECT dataset, table_name FROM spec_columns WHERE column_name = ? ORDER BY dataset, table_name",
+                              [column_name.upper()]).fetchall()
+
+def _block_size(block):
+    # Przybliżony rozmiar bloku w pamięci (w bajtach)
+    if isinstance(block, DatasetHandle):
+        return sys.getsizeof(block)
+    if isinstance(block, list):
+        return sum(sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record.values()) for record in block)
+    return int(block.memory_usage(deep=True).sum())
+
+# Miejsce bloku przeniesionego do pliku tymczasowego
+_SPILLED = object()
+
+class SpillingBlockBuffer:
+    # Bufor bloków z limitem pamięci - po przekroczeniu limitu bloki trafiają do pliku tymczasowego
+    # Leniwe uchwyty (DatasetHandle) zostają w pamięci - są małe, a ich skoroszyt ma otwarty kursor wierszy
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.blocks = []
+        self.size = 0
+        self.spill_file = None
+        self.spilled = 0
+        self.pending = 0
+
+    def append(self, block):
+        self.blocks.append(block)
+        if isinstance(block, DatasetHandle):
+            return
+        self.size += _block_size(block)
+        if self.size > self.max_bytes:
+            self._spill()
+
+    def _spill(self):
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile()
+        # Tylko bloki dodane od poprzedniego przeniesienia
+        for i in range(self.pending, len(self.blocks)):
+            block = self.blocks[i]
+            if not isinstance(block, DatasetHandle):
+                pickle.dump(block, self.spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+                self.blocks[i] = _SPILLED
+                self.spilled += 1
+        self.pending = len(self.blocks)
+        self.size = 0
+
+    def __iter__(self):
+        # Bloki w kolejności dodania - przeniesione czytane po kolei z pliku
+        if self.spill_file is not None:
+            self.spill_file.flush()
+            self.spill_file.seek(0)
+        for block in self.blocks:
+            yield pickle.load(self.spill_file) if block is _SPILLED else block
+        if self.spill_file is not None:
+            self.spill_file.seek(0, os.SEEK_END)
+
+    def close(self):
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+        self.blocks = []
+
+def emit_datasets(datasets, dataset_name, model_name, output_dir, generate_lookml, save_datasets, registry=None, incremental=False,
+                  memory_report=False, spec_store=None, max_memory_mb=None, match_engine='sets'):
+    # Przy limicie pamięci bloki zapamiętane do zapisu JSON mogą być przeniesione na dysk
+    saved_datasets = SpillingBlockBuffer(max_memory_mb * 2**20) if max_memory_mb and save_datasets else []
+    registry = _as_registry(registry)
+    base_matches = None
+    if match_engine in ('bitmask', 'bitmask_numpy'):
+        # Maski opłacają się tylko dla wszystkich tabel naraz - bloki czytane strumieniowo
+        # dopasowywane są jak zwykle, przez indeks odwrócony
+        if isinstance(datasets, list) and generate_lookml:
+            # Wszystkie bloki znane z góry (także leniwe uchwyty)
+            base_matches = BitmaskMatcher(registry, match_engine == 'bitmask_numpy').match_tables([_block_column_names(dataset) for dataset in datasets])
+    output_paths = []
+    memory_stats = None
+    store = open_spec_store(spec_store) if spec_store else None
+    if incremental:
+        manifest = load_manifest(output_dir, model_name)
+        blocks = {}
+        skipped = 0
+    for i, dataset in enumerate(datasets):
+        if save_datasets:
+            saved_datasets.append(dataset)
+        if isinstance(dataset, DatasetHandle) and (memory_report or store is not None):
+            dataset = dataset.materialize()
+        if memory_report:
+            memory_stats = string_memory_stats([dataset], memory_stats)
+        if store is not None:
+            upsert_spec_store(store, dataset_name, dataset)
+        if generate_lookml:
+            if incremental:
+                table_name = str(_block_table_name(dataset)).lower()
+                fingerprint = block_fingerprint(dataset, registry)
+                blocks[table_name] = fingerprint
+                output_path = os.path.join(output_dir, _strip_spec_extension(model_name), f"{table_name}.view.lkml")
+                if manifest['blocks'].get(table_name) == fingerprint and os.path.exists(output_path):
+                    skipped += 1
+                    output_paths.append(output_path)
+                    continue
+            print(f'################## nr datasetu: {i}##################')
+            base_match = base_matches[i] if base_matches is not None else None
+            output_paths.append(generate_lookml_from_excel(dataset, dataset_name, model_name, output_dir, registry, base_match))
+    if incremental and generate_lookml:
+        # Wpisy tabel spoza tego przebiegu (np. przy --tables) pozostają w manifeście
+        manifest['blocks'].update(blocks)
+        save_manifest(manifest, output_dir, model_name)
+        print(f"Pominięto niezmienione widoki: {skipped}")
+    if store is not None:
+        store.close()
+    if memory_report and memory_stats is not None:
+        print_string_memory_report(memory_stats)
+    if save_datasets and isinstance(saved_datasets, SpillingBlockBuffer):
+        if saved_datasets.spill_file is not None:
+            print(f"Bloki przeniesione na dysk (limit pamięci): {saved_datasets.spilled}")
+        write_datasets_json(saved_datasets, dataset_name)
+        saved_datasets.close()
+    elif save_datasets:
+            save_datasets_to_json(saved_datasets,dataset_name)
+    return output_paths
+
+def _process_sheet(task):
+    file_path, sheet_name, namespace, model_name, output_dir, load_options, emit_options, registry = task
+    datasets = load_datasets(file_path, sheet_name=sheet_name, **load_options)
+    # Każdy arkusz to osobny dataset - widoki trafiają do output_dir/<model>/<arkusz>/
+    return emit_datasets(datasets, namespace, namespace, os.path.join(output_dir, model_name),
+                         registry=registry, **emit_options)
+
+def process_sheets(file_path, model_name, sheets, output_dir, load_options, emit_options, jobs=None, registry=None):
+    model_name = _strip_spec_extension(model_name)
+    if select_reader(file_path, load_options.get('reader')) == 'csv':
+        # CSV/TSV ma jeden arkusz - przestrzenią nazw jest nazwa pliku bez rozszerzenia
+        sheets, namespaces = [0], [model_name]
+    else:
+        if sheets is None or sheets == ['all']:
+            sheets = list_sheets(file_path, load_options.get('reader'))
+        namespaces = sheets
+    # Rejestr wczytany raz w procesie głównym i przekazany do arkuszy
+    registry = _as_registry(registry).load()
+    tasks = [(file_path, sheet_name, namespace, model_name, output_dir, load_options, emit_options, registry)
+             for sheet_name, namespace in zip(sheets, namespaces)]
+    if jobs == 1 or len(tasks) == 1:
+        results = [_process_sheet(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_process_sheet, tasks))
+    # Wyniki w kolejności arkuszy, niezależnie od kolejności zakończenia procesów
+    return dict(zip(namespaces, results))
+
+def clean_excel_file(file_path,model_name, generate_lookml, save_datasets, generate_connections, output_dir, stream=False, cache_dir=None, max_cache_mb=None, reader=None,
+                     sheets=None, jobs=None, incremental=False, project_columns=False, stdin_format='csv', dataset_name=None,
+                     tables=None, memory_report=False, spec_store=None, from_store=False, max_memory_mb=None, lazy=False,
+                     base_views_path=BASE_VIEWS_PATH, base_cache_dir=None, match_engine='sets', base_recursive=False,
+                     base_include=None, base_exclude=None):
+    # Get file name (dataset name)
+    if dataset_name is None:
+        dataset_name = _strip_spec_extension(os.path.basename(file_path))
         
     if generate_connections:
         excluded_columns = ["FROM_DATE","TO_DATE","IS_LAST_FLAG","LINEAGE_ID","LOAD_TS","LAST_MOD_TS","SOURCE_SYSTEM_ID",
@@ -75,13 +1496,80 @@ def clean_excel_file(file_path,model_name, generate_lookml, save_datasets, gener
 
         with open("link_data.json", "w", encoding="utf-8") as f:
             json.dump({"linkDataArray": link_data_array}, f, indent=4)
-    
-    if save_datasets:
-            save_datasets_to_json(datasets,dataset_name)
-    if generate_lookml:
-        for i, dataset in enumerate(datasets):
-            print(f'################## nr datasetu: {i}##################')
-            generate_lookml_from_excel(dataset, dataset_name, model_name, output_dir, base_columns)
+
+    if max_memory_mb:
+        # Limit pamięci: arkusz czytany strumieniowo, bez ładowania całej listy bloków z cache
+        stream, cache_dir = True, None
+    load_options = dict(stream=stream, cache_dir=cache_dir, max_cache_mb=max_cache_mb, reader=reader,
+                        columns=SPEC_COLUMNS if project_columns else None, stdin_format=stdin_format, tables=tables, lazy=lazy)
+    emit_options = dict(generate_lookml=generate_lookml, save_datasets=save_datasets, incremental=incremental,
+                        memory_report=memory_report, spec_store=None if from_store else spec_store, max_memory_mb=max_memory_mb,
+                        match_engine=match_engine)
+    registry = get_base_view_registry(base_views_path, base_cache_dir, base_recursive, base_include, base_exclude)
+    if from_store:
+        # Generowanie ze store SQLite zamiast z pliku
+        with closing(open_spec_store(spec_store)) as store:
+            datasets = load_datasets_from_store(store, dataset_name, tables)
+            return emit_datasets(datasets, dataset_name, model_name, output_dir, registry=registry, **emit_options)
+
+    if sheets:
+        return process_sheets(file_path, model_name, sheets, output_dir, load_options, emit_options, jobs, registry)
+
+    datasets = load_datasets(file_path, **load_options)
+    return emit_datasets(datasets, dataset_name, model_name, output_dir, registry=registry, **emit_options)
+
+def expand_spec_paths(path):
+    # Katalog, wzorzec glob albo pojedynczy plik
+    if os.path.isdir(path):
+        paths = [os.path.join(path, f) for f in os.listdir(path)]
+    else:
+        paths = glob.glob(path)
+    # Pomiń pliki blokady Excela (~$...)
+    return sorted(p for p in paths if p.lower().endswith(SPEC_EXTENSIONS)
+                  and not os.path.basename(p).startswith('~$') and os.path.isfile(p))
+
+def is_batch_path(path):
+    return os.path.isdir(path) or any(c in path for c in '*?[')
+
+def _init_batch_worker(registry):
+    # Rejestr widoków bazowych przekazany raz z procesu głównego
+    _base_view_registries[registry.key] = registry
+
+def _process_workbook(task):
+    file_path, options = task
+    start = time.perf_counter()
+    try:
+        result = clean_excel_file(file_path, os.path.basename(file_path), **options)
+        views = sum(len(paths) for paths in result.values()) if isinstance(result, dict) else len(result)
+        return file_path, views, None, time.perf_counter() - start
+    except Exception as e:
+        return file_path, 0, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+def _options_registry(options):
+    # Rejestr dla opcji clean_excel_file (tryb wsadowy)
+    return get_base_view_registry(options.get('base_views_path', BASE_VIEWS_PATH), options.get('base_cache_dir'),
+                                  options.get('base_recursive', False), options.get('base_include'), options.get('base_exclude'))
+
+def process_batch(paths, jobs=None, **options):
+    start = time.perf_counter()
+    # Arkusze w ramach skoroszytu przetwarzane sekwencyjnie - równolegle idą całe skoroszyty
+    options['jobs'] = 1
+    tasks = [(file_path, options) for file_path in paths]
+    if jobs == 1:
+        results = [_process_workbook(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker,
+                                 initargs=(_options_registry(options).load(),)) as executor:
+            results = list(executor.map(_process_workbook, tasks))
+
+    failed = [r for r in results if r[2] is not None]
+    print(f"Podsumowanie: skoroszyty: {len(results)}, widoki: {sum(r[1] for r in results)}, "
+          f"błędy: {len(failed)}, czas: {time.perf_counter() - start:.1f}s")
+    for file_path, views, error, elapsed in results:
+        status = f"BŁĄD {error}" if error else f"widoki: {views}"
+        print(f"  {file_path}: {status} ({elapsed:.1f}s)")
+    return results
 
 def load_dataframes_from_json(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -130,8 +1618,8 @@ def save_datasets_to_json(datasets,dataset_name):
     f_name = dataset_name + '.json'
     dict_datasets = []
     for d in datasets:
-        file_name = d['TABLE NAME'].iloc[0]
-        dict_datasets.append({file_name: d.to_dict(orient='records')})
+        file_name = _block_table_name(d)
+        dict_datasets.append({file_name: _block_records(d)})
     with open(f_name,'w', encoding='utf-8') as f:
         json.dump(dict_datasets,f, indent = 4,ensure_ascii = False)
 
@@ -139,38 +1627,41 @@ def save_datasets_to_json(datasets,dataset_name):
     print(f"Zapisano jako: {f_name}")
     return dict_datasets
     
-def generate_lookml_from_excel(df, dataset_name, model_name, output_dir, base_columns):
+def write_datasets_json(datasets, dataset_name):
+    # Ten sam plik co save_datasets_to_json, ale zapisywany blok po bloku (bez listy wszystkich bloków w pamięci)
+    f_name = dataset_name + '.json'
+    with open(f_name, 'w', encoding='utf-8') as f:
+        f.write('[')
+        count = 0
+        for d in datasets:
+            item = json.dumps({_block_table_name(d): _block_records(d)}, indent=4, ensure_ascii=False)
+            f.write((',\n' if count else '\n') + textwrap.indent(item, '    ', lambda line: True))
+            count += 1
+        f.write('\n]' if count else ']')
+    print(f"Zapisano jako: {f_name}")
+
+def generate_lookml_from_excel(df, dataset_name, model_name, output_dir, registry=None, base_match=None):
+    # registry - BaseViewRegistry (albo słownik widok -> kolumny); domyślnie rejestr procesu dla BASE_VIEWS_PATH
+    # base_match - dopasowanie do widoków bazowych policzone wcześniej (np. BitmaskMatcher)
+    df = _materialize(df)
     lookml_code_dim = []
     lookml_code_dimgr = []
     lookml_code_m = []
-    file_name = df['TABLE NAME'].iloc[0]
-    df_columns = set(df['COLUMN NAME'].str.upper().tolist()) # Get columns from DataFrame
-    df = df.fillna('')
-    df = df.sort_values(by='COLUMN NAME')
+    file_name = _block_table_name(df)
+    df_columns = _block_column_names(df) # Get columns from DataFrame
+    column_specs = build_column_specs(df)
     
-    extends_views = []
-    include_paths = []
-    commented_dimensions = set()
     comment_prefix = ""
+    # Jedna konwersja - słownik zamieniony dwa razy budowałby indeks kolumn dwukrotnie
+    registry = _as_registry(registry)
 
-    missing_base_columns = {}
-    for view_name, columns in base_columns.items():
-        base_column_names = set(columns.keys())
-        if not base_column_names.isdisjoint(df_columns):
-            extends_views.append(view_name)
-            include_paths.append(f"/datasets/_base/views/{view_name}.view.lkml")
-            commented_dimensions.update(base_column_names.intersection(df_columns))
-            for col_name in base_column_names - df_columns:
-                missing_base_columns[col_name] = columns[col_name]
-
-    for index, row in df.iterrows():
-        column_data = _get_column_data(row)
-        column_name = column_data['column_name']
-        description = column_data['description']
-        data_type = column_data['data_type']
-        label = column_data['label']
-        group_label = column_data['group_label']
-         
+    if base_match is None:
+        # Tylko widoki bazowe znalezione w indeksie odwróconym po kolumnach tabeli
+        base_match = registry.match_table(df_columns)
+    extends_views, commented_dimensions, missing_base_columns = base_match
+    include_paths = [registry.include_path(view_name) for view_name in extends_views]
+
+    for column_name, description, data_type, label, group_label in column_specs:
         table_id = file_name
         dataset_id = dataset_name.upper()
 
@@ -322,7 +1813,7 @@ def generate_lookml_from_excel(df, dataset_name, model_name, output_dir, base_co
     for col_name, col_type in missing_base_columns.items():
         lookml_code_dim.append(f'    {col_type}: {col_name.lower()} {{hidden: yes}}\n')
 
-    model_name = model_name.replace(".xlsx","")
+    model_name = _strip_spec_extension(model_name)
     model_specific_output_dir = os.path.join(output_dir, model_name)
     os.makedirs(model_specific_output_dir, exist_ok=True)
     file_name = file_name.lower()
@@ -339,15 +1830,84 @@ def generate_lookml_from_excel(df, dataset_name, model_name, output_dir, base_co
         f.write(''.join(lookml_code_m))
         f.write("\n}")
 
+    return output_path
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Generate LookML from an Excel file.')
-    parser.add_argument("file_path", help="Path to the Excel file")
+    parser.add_argument("file_path", nargs="?", help="Path to the Excel file, a directory / glob pattern for batch mode, or - to read the spec from stdin")
     parser.add_argument("--output_dir", default="#generated", help="Directory to save generated LookML files.")
     parser.add_argument("--save_datasets", action="store_true", help="Save datasets to JSON")
     parser.add_argument("--generate_lookml", action="store_true", default=True, help="Generate LookML")
     parser.add_argument("--generate_connections", action="store_true", help="Generate connections")
+    parser.add_argument("--stream", action="store_true", help="Read the sheet block by block (row reader of the selected backend) and generate each view as soon as its block is read")
+    parser.add_argument("--reader", choices=list(READER_BACKENDS), help="Spreadsheet reader backend (default: fastest available for the file type)")
+    parser.add_argument("--benchmark_readers", action="store_true", help="Compare available reader backends on file_path and exit")
+    parser.add_argument("--sheets", type=lambda value: value.split(','), help="Comma separated sheet names, or 'all'. Each sheet is a separate dataset written to output_dir/<model>/<sheet>/ (CSV/TSV: one dataset named after the file)")
+    parser.add_argument("--jobs", type=int, default=None, help="Number of worker processes for --sheets or batch mode (default: CPU count)")
+    parser.add_argument("--incremental", action="store_true", help="Regenerate only views whose block or matching base views changed since the last run (tracked in a manifest in the model output folder)")
+    parser.add_argument("--project_columns", action="store_true", help="Read only the columns used for generation (%s) and keep low-cardinality ones as categoricals" % ', '.join(SPEC_COLUMNS))
+    parser.add_argument("--parse_cache", action="store_true", help="Reuse parsed datasets cached by workbook content hash and generator version")
+    parser.add_argument("--cache_dir", default=PARSE_CACHE_DIR, help="Directory of the parse cache and of the base view index.")
+    parser.add_argument("--cache_max_mb", type=float, default=512, help="Size cap of the parse cache in MB (least recently used entries are removed first).")
+    parser.add_argument("--clear_cache", action="store_true", help="Remove all parse cache entries before running")
+    parser.add_argument("--tables", type=lambda value: value.split(','), help="Comma separated TABLE NAMEs to generate; only their row ranges are parsed (using a pre-scan index cached next to the workbook)")
+    parser.add_argument("--base_views_path", default=BASE_VIEWS_PATH, help="Directory with the base .view.lkml files used for extends")
+    parser.add_argument("--base_recursive", action="store_true", help="Scan --base_views_path recursively (os.scandir); changed files are read by a thread pool")
+    parser.add_argument("--base_include", type=lambda value: value.split(','), help="Comma separated glob patterns of base view files, relative to --base_views_path (default: %s)" % ','.join(BASE_VIEW_PATTERNS))
+    parser.add_argument("--base_exclude", type=lambda value: value.split(','), help="Comma separated glob patterns of base view files or folders to skip, relative to --base_views_path")
+    parser.add_argument("--no_base_cache", action="store_true", help="Re-parse every base view instead of reusing the base view index kept in --cache_dir (refreshed per file by mtime and size)")
+    parser.add_argument("--match_engine", choices=MATCH_ENGINES, default="sets", help="How tables are matched to base views: per-table set lookups through the inverted column index, or bulk bitmask intersections for all table/base pairs at once (Python integers, or uint64 NumPy arrays with bitmask_numpy); with a bitmask engine hidden base fields are listed in declaration order")
+    parser.add_argument("--lazy", action="store_true", help="Use dataset handles (table name + row range from the pre-scan index); rows are read only when a view is rendered or datasets are saved, so tables skipped by --tables or --incremental are never read")
+    parser.add_argument("--memory_report", action="store_true", help="Print how much memory the spec text values take after interning compared to one copy per cell")
+    parser.add_argument("--stdin_format", choices=STDIN_FORMATS, default="csv", help="Format of the spec read from stdin when file_path is - (CSV/TSV with a header line, or JSON Lines)")
+    parser.add_argument("--dataset_name", help="Dataset (and model folder) name; required when reading from stdin")
+    parser.add_argument("--spec_store", help="SQLite database keyed by (dataset, table, column); every processed block is upserted into it")
+    parser.add_argument("--from_store", action="store_true", help="Generate the dataset named by file_path (or --dataset_name) from --spec_store instead of parsing the file")
+    parser.add_argument("--find_column", help="List the tables in --spec_store that have this column and exit")
+    parser.add_argument("--max_memory", type=float, metavar="MB", help="Peak memory budget for spec blocks: the sheet is streamed block by block, each block is released after its view is written and blocks kept for --save_datasets are spilled to a temporary file above MB")
     args = parser.parse_args()
 
-    model_name = os.path.basename(args.file_path)
+    if (args.from_store or args.find_column) and not args.spec_store:
+        parser.error("--from_store and --find_column require --spec_store")
+    if args.find_column:
+        with closing(open_spec_store(args.spec_store)) as store:
+            for dataset, table_name in find_tables_with_column(store, args.find_column):
+                print(f"{dataset}.{table_name}")
+        raise SystemExit(0)
+    if args.file_path is None:
+        parser.error("the following arguments are required: file_path")
+
+    if args.clear_cache:
+        clear_parse_cache(args.cache_dir)
+
+    if args.benchmark_readers:
+        benchmark_readers(args.file_path)
+        raise SystemExit(0)
+
+    if is_batch_path(args.file_path):
+        paths = expand_spec_paths(args.file_path)
+        if not paths:
+            parser.error(f"Brak plików specyfikacji dla: {args.file_path}")
+        results = process_batch(paths, args.jobs, generate_lookml=args.generate_lookml, save_datasets=args.save_datasets,
+                                generate_connections=args.generate_connections, output_dir=args.output_dir, stream=args.stream,
+                                cache_dir=args.cache_dir if args.parse_cache else None, max_cache_mb=args.cache_max_mb,
+                                reader=args.reader, sheets=args.sheets, incremental=args.incremental,
+                                project_columns=args.project_columns, tables=args.tables, memory_report=args.memory_report,
+                                spec_store=args.spec_store, max_memory_mb=args.max_memory, lazy=args.lazy,
+                                base_views_path=args.base_views_path, base_cache_dir=None if args.no_base_cache else args.cache_dir,
+                                match_engine=args.match_engine, base_recursive=args.base_recursive, base_include=args.base_include,
+                                base_exclude=args.base_exclude)
+        raise SystemExit(1 if any(error for _, _, error, _ in results) else 0)
+
+    if args.file_path == '-' and args.dataset_name is None:
+        parser.error("--dataset_name is required when reading from stdin")
+    model_name = args.dataset_name or os.path.basename(args.file_path)
     
-    clean_excel_file(args.file_path, model_name, args.generate_lookml, args.save_datasets, args.generate_connections, args.output_dir)
\ No newline at end of file
+    clean_excel_file(args.file_path, model_name, args.generate_lookml, args.save_datasets, args.generate_connections, args.output_dir,
+                     stream=args.stream, cache_dir=args.cache_dir if args.parse_cache else None, max_cache_mb=args.cache_max_mb,
+                     reader=args.reader, sheets=args.sheets, jobs=args.jobs, incremental=args.incremental,
+                     project_columns=args.project_columns, stdin_format=args.stdin_format, dataset_name=args.dataset_name,
+                     tables=args.tables, memory_report=args.memory_report, spec_store=args.spec_store, from_store=args.from_store,
+                     max_memory_mb=args.max_memory, lazy=args.lazy, base_views_path=args.base_views_path,
+                     base_cache_dir=None if args.no_base_cache else args.cache_dir, match_engine=args.match_engine,
+                     base_recursive=args.base_recursive, base_include=args.base_include, base_exclude=args.base_exclude)
\ No newline at end of file
@@ -0,0 +1,977 @@
+import re
+import os
+import json
+import argparse
+import csv
+import glob
+import sys
+import hashlib
+import pickle
+import importlib.util
+import time
+from collections import namedtuple
+from operator import itemgetter
+
+__version__ = "4.13.0"
+
+PARSE_CACHE_DIR = '.lookml_cache'
+MANIFEST_FILE = '.lookml_manifest.json'
+
+# Kolumny specyfikacji używane przy generowaniu
+SPEC_COLUMNS = ['ID', 'TABLE NAME', 'COLUMN NAME', 'TYPE', 'DESCRIPTION', 'LABEL', 'GROUP_LABEL']
+# Kolumny o niewielkiej liczbie różnych wartości - przechowywane jako category
+CATEGORICAL_COLUMNS = ['TABLE NAME', 'TYPE', 'GROUP_LABEL']
+
+def load_base_columns(base_views_path):
+    base_columns = {}
+    for file_name in os.listdir(base_views_path):
+        if file_name.endswith(".view.lkml"):
+            view_name = file_name.replace(".view.lkml", "")
+            with open(os.path.join(base_views_path, file_name), 'r') as f:
+                content = f.read()
+                columns = re.findall(r'(dimension|dimension_group|measure): (\w+)', content)
+                base_columns[view_name] = {c[1].upper(): c[0] for c in columns}
+    return base_columns
+
+BASE_VIEWS_PATH = '#models/_base/views'
+
+# Wczytywane przy pierwszym użyciu (get_base_columns), a nie przy imporcie modułu
+base_columns = None
+
+def get_base_columns():
+    global base_columns
+    if base_columns is None:
+        base_columns = load_base_columns(BASE_VIEWS_PATH)
+    return base_columns
+
+predefined_columns = {}
+
+# Dane jednej kolumny specyfikacji używane przy generowaniu widoku
+ColumnSpec = namedtuple('ColumnSpec', ['column_name', 'description', 'data_type', 'label', 'group_label'])
+
+def _column_values(df, column):
+    if isinstance(df, list):
+        # Blok jako lista rekordów (ścieżka bez pandas)
+        return ['' if _is_blank(record.get(column)) else record.get(column) for record in df]
+    import pandas as pd
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    return values.fillna('').tolist()
+
+def build_column_specs(df):
+    # Cały blok naraz - kolumny jako listy, posortowane po COLUMN NAME
+    rows = sorted(zip(*(_column_values(df, column) for column in ['COLUMN NAME', 'DESCRIPTION', 'TYPE', 'LABEL', 'GROUP_LABEL'])),
+                  key=itemgetter(0))
+    return [ColumnSpec(column_name.lower(), description.replace('"', "''"), data_type.lower(), label, group_label)
+            for column_name, description, data_type, label, group_label in rows]
+
+def _is_blank(value):
+    return value is None or value == '' or (isinstance(value, float) and value != value)
+
+def _iter_row_blocks(rows, columns=None, skip_first_row=True):
+    # rows - krotki wartości kolejnych wierszy arkusza, tak jak zwraca openpyxl (values_only)
+    # columns - opcjonalna lista kolumn nagłówka, które mają zostać zachowane
+    rows = iter(rows)
+    # Pierwszy wiersz arkusza pd.read_excel traktuje jako nagłówek i jest on pomijany
+    if skip_first_row:
+        next(rows, None)
+    header = None
+    keep = []
+    id_pos = None
+    current_dataset = []
+    for row in rows:
+        # Pomiń puste wiersze
+        if all(_is_blank(value) for value in row):
+            continue
+        # Pierwszy niepusty wiersz to właściwy nagłówek
+        if header is None:
+            keep = [i for i, value in enumerate(row) if not _is_blank(value) and (columns is None or value in columns)]
+            header = [row[i] for i in keep]
+            id_pos = header.index('ID')
+            continue
+        values = tuple(row[i] if i < len(row) else None for i in keep)
+        if _is_blank(values[id_pos]):
+            if current_dataset:
+                yield header, current_dataset
+                current_dataset = []
+        else:
+            current_dataset.append(values)
+
+    if current_dataset:
+        yield header, current_dataset
+
+def _iter_openpyxl_rows(file_path, sheet_name=0):
+    import openpyxl
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+def _iter_csv_rows(file_path, sheet_name=0):
+    # Plik CSV ma zawsze jeden arkusz; puste pola traktowane jak puste komórki
+    delimiter = '\t' if file_path.lower().endswith('.tsv') else ','
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.reader(f, delimiter=delimiter):
+            yield tuple(value if value != '' else None for value in row)
+
+def _row_reader(file_path, reader=None):
+    row_reader = READER_BACKENDS[select_reader(file_path, reader)][3]
+    if row_reader is None:
+        # Backend bez czytania wierszy (np. calamine) - dla xlsx używamy openpyxl
+        if os.path.splitext(file_path)[1].lower() not in READER_BACKENDS['openpyxl'][1]:
+            raise ValueError(f"Brak backendu czytającego wiersze dla pliku {file_path}")
+        row_reader = _iter_openpyxl_rows
+    return row_reader
+
+def iter_record_blocks(file_path, reader=None, sheet_name=0, columns=None):
+    # Bloki jako listy rekordów (dict), bez budowania DataFrame i bez importu pandas
+    row_reader = _row_reader(file_path, reader)
+    for header, rows in _iter_row_blocks(row_reader(file_path, sheet_name), columns):
+        yield [dict(zip(header, values)) for values in rows]
+
+def _iter_jsonl_blocks(lines, columns=None):
+    # Każda linia to rekord JSON; rekord bez ID zamyka bieżący blok
+    current_dataset = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if columns is not None:
+            record = {column: record.get(column) for column in columns}
+        if _is_blank(record.get('ID')):
+            if current_dataset:
+                yield current_dataset
+                current_dataset = []
+        else:
+            current_dataset.append(record)
+
+    if current_dataset:
+        yield current_dataset
+
+def scan_table_index(file_path, reader=None, sheet_name=0):
+    # Lekki przegląd arkusza: numery wierszy (od 1) nagłówka i zakresy wierszy każdej tabeli
+    header_row = None
+    header = []
+    tables = {}
+    current_range = None
+    for row_number, row in enumerate(_row_reader(file_path, reader)(file_path, sheet_name), start=1):
+        # Pierwszy wiersz arkusza i puste wiersze są pomijane, jak przy pełnym czytaniu
+        if row_number == 1 or all(_is_blank(value) for value in row):
+            continue
+        if header_row is None:
+            header_row = row_number
+            header = [None if _is_blank(value) else value for value in row]
+            id_pos = header.index('ID')
+            name_pos = header.index('TABLE NAME')
+            continue
+        if id_pos >= len(row) or _is_blank(row[id_pos]):
+            current_range = None
+        elif current_range is None:
+            current_range = [row_number, row_number]
+            tables.setdefault(str(row[name_pos]), []).append(current_range)
+        else:
+            current_range[1] = row_number
+    return {'header_row': header_row, 'header': header, 'tables': tables}
+
+def _table_index_path(file_path):
+    return f"{file_path}.index.json"
+
+def load_table_index(file_path, reader=None, sheet_name=0):
+    # Indeks zapisywany obok skoroszytu, unieważniany po zmianie rozmiaru/daty pliku lub wersji generatora
+    index_path = _table_index_path(file_path)
+    stat = os.stat(file_path)
+    key = {'version': __version__, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    index = None
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    if index is None or index.get('key') != key:
+        index = {'key': key, 'sheets': {}}
+    entry = index['sheets'].get(str(sheet_name))
+    if entry is None:
+        entry = scan_table_index(file_path, reader, sheet_name)
+        index['sheets'][str(sheet_name)] = entry
+        try:
+            tmp_path = index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"Nie zapisano indeksu {index_path}: {e}")
+    return entry
+
+def iter_table_blocks(file_path, tables, reader=None, sheet_name=0, columns=None):
+    # Czyta tylko zakresy wierszy wybranych tabel (wg indeksu) i kończy po ostatnim z nich
+    entry = load_table_index(file_path, reader, sheet_name)
+    header = entry['header']
+    keep = [i for i, value in enumerate(header) if value is not None and (columns is None or value in columns)]
+    names = [header[i] for i in keep]
+    wanted = {str(table).upper() for table in tables}
+    found = {name.upper() for name in entry['tables']}
+    for table in sorted(wanted - found):
+        print(f"Brak tabeli w skoroszycie: {table}")
+    ranges = sorted(table_range for name, table_ranges in entry['tables'].items()
+                    if name.upper() in wanted for table_range in table_ranges)
+    if not ranges:
+        return
+
+    rows = _row_reader(file_path, reader)(file_path, sheet_name)
+    try:
+        k = 0
+        current_dataset = []
+        for row_number, row in enumerate(rows, start=1):
+            if row_number < ranges[k][0]:
+                continue
+            if row_number > ranges[k][1]:
+                if current_dataset:
+                    yield current_dataset
+                    current_dataset = []
+                k += 1
+                if k == len(ranges):
+                    break
+                if row_number < ranges[k][0]:
+                    continue
+            if not all(_is_blank(value) for value in row):
+                current_dataset.append(dict(zip(names, (row[i] if i < len(row) else None for i in keep))))
+        if current_dataset:
+            yield current_dataset
+    finally:
+        rows.close()
+
+STDIN_FORMATS = ('csv', 'tsv', 'jsonl')
+
+def iter_stdin_blocks(stdin_format='csv', columns=None, stream=None):
+    # Specyfikacja ze standardowego wejścia - blok jest zwracany, gdy tylko nadejdzie jego separator.
+    # W CSV/TSV pierwsza linia jest nagłówkiem (bez wiersza tytułowego arkusza)
+    stream = sys.stdin if stream is None else stream
+    if stdin_format == 'jsonl':
+        yield from _iter_jsonl_blocks(stream, columns)
+        return
+    rows = csv.reader(stream, delimiter='\t' if stdin_format == 'tsv' else ',')
+    rows = (tuple(value if value != '' else None for value in row) for row in rows)
+    for header, block_rows in _iter_row_blocks(rows, columns, skip_first_row=False):
+        yield [dict(zip(header, values)) for values in block_rows]
+
+def _block_table_name(block):
+    if isinstance(block, list):
+        return block[0]['TABLE NAME']
+    return block['TABLE NAME'].iloc[0]
+
+def _block_column_names(block):
+    if isinstance(block, list):
+        return {str(record['COLUMN NAME']).upper() for record in block if not _is_blank(record.get('COLUMN NAME'))}
+    return set(block['COLUMN NAME'].str.upper().tolist())
+
+def _block_records(block):
+    if isinstance(block, list):
+        return block
+    return block.to_dict(orient='records')
+
+def iter_excel_blocks(file_path, sheet_name=0, columns=None):
+    # Strumieniowe czytanie arkusza - zwraca po jednym bloku (datasecie) naraz
+    import pandas as pd
+    for header, rows in _iter_row_blocks(_iter_openpyxl_rows(file_path, sheet_name), columns):
+        yield pd.DataFrame(rows, columns=header)
+
+def _categorize(df):
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+def read_projected_datasets(file_path, sheet_name=0, columns=SPEC_COLUMNS):
+    # Czytanie strumieniowe tylko wybranych kolumn - puste wiersze i separatory
+    # rozpoznawane są nadal po całym wierszu arkusza
+    import pandas as pd
+    header = None
+    rows = []
+    block_sizes = []
+    for header, block_rows in _iter_row_blocks(_iter_openpyxl_rows(file_path, sheet_name), columns):
+        rows.extend(block_rows)
+        block_sizes.append(len(block_rows))
+    if header is None:
+        return []
+    df = _categorize(pd.DataFrame(rows, columns=header))
+    del rows
+    datasets = []
+    start = 0
+    for size in block_sizes:
+        datasets.append(df.iloc[start:start + size])
+        start += size
+    return datasets
+
+def _read_with_openpyxl(file_path, sheet_name=0):
+    import pandas as pd
+    return pd.read_excel(file_path, engine='openpyxl', sheet_name=sheet_name)
+
+def _read_with_calamine(file_path, sheet_name=0):
+    import pandas as pd
+    return pd.read_excel(file_path, engine='calamine', sheet_name=sheet_name)
+
+def _read_with_odf(file_path, sheet_name=0):
+    import pandas as pd
+    return pd.read_excel(file_path, engine='odf', sheet_name=sheet_name)
+
+def _read_with_csv(file_path, sheet_name=0):
+    # Plik CSV ma zawsze jeden arkusz
+    import pandas as pd
+    sep = '\t' if file_path.lower().endswith('.tsv') else ','
+    return pd.read_csv(file_path, sep=sep)
+
+# Backendy czytające arkusz, w kolejności od najszybszego
+# nazwa: (wymagany moduł, obsługiwane rozszerzenia, funkcja czytająca DataFrame, funkcja czytająca wiersze)
+READER_BACKENDS = {
+    'calamine': ('python_calamine', ('.xlsx', '.xlsm', '.xls', '.ods'), _read_with_calamine, None),
+    'openpyxl': ('openpyxl', ('.xlsx', '.xlsm'), _read_with_openpyxl, _iter_openpyxl_rows),
+    'odf': ('odf', ('.ods',), _read_with_odf, None),
+    'csv': (None, ('.csv', '.tsv'), _read_with_csv, _iter_csv_rows),
+}
+
+SPEC_EXTENSIONS = tuple(sorted({ext for _, extensions, _, _ in READER_BACKENDS.values() for ext in extensions}))
+
+def _strip_spec_extension(name):
+    root, ext = os.path.splitext(name)
+    return root if ext.lower() in SPEC_EXTENSIONS else name
+
+def available_readers():
+    return [name for name, (module, _, _, _) in READER_BACKENDS.items()
+            if module is None or importlib.util.find_spec(module) is not None]
+
+def select_reader(file_path, reader=None):
+    ext = os.path.splitext(file_path)[1].lower()
+    available = available_readers()
+    if reader is not None:
+        if reader not in READER_BACKENDS:
+            raise ValueError(f"Nieznany backend: {reader}. Dostępne: {', '.join(READER_BACKENDS)}")
+        if reader not in available:
+            raise ValueError(f"Backend {reader} wymaga modułu {READER_BACKENDS[reader][0]}, który nie jest zainstalowany")
+        return reader
+    for name in available:
+        if ext in READER_BACKENDS[name][1]:
+            return name
+    raise ValueError(f"Brak dostępnego backendu dla plików {ext}")
+
+def list_sheets(file_path, reader=None):
+    reader = select_reader(file_path, reader)
+    if reader == 'csv':
+        return [0]
+    import pandas as pd
+    with pd.ExcelFile(file_path, engine=reader) as workbook:
+        return workbook.sheet_names
+
+def read_excel_datasets(file_path, reader=None, sheet_name=0, columns=None):
+    reader = select_reader(file_path, reader)
+    if columns is not None and reader == 'openpyxl':
+        return read_projected_datasets(file_path, sheet_name, columns)
+
+    # Load the Excel file
+    df = READER_BACKENDS[reader][2](file_path, sheet_name)
+    
+    # Drop blank rows
+    df.dropna(how='all', inplace=True)
+    
+     # Usuń pierwszy wiersz
+    df = df.iloc[0:].reset_index(drop=True)
+    
+    # Ustaw drugi wiersz jako nagłówek
+    df.columns = df.iloc[0]
+    df = df[1:].reset_index(drop=True)
+    
+    # Inicjalizacja zmiennych
+    df = df.drop(df.columns[df.columns.isna()],axis = 1)
+
+    if columns is not None:
+        df = _categorize(df[[c for c in df.columns if c in columns]])
+    
+    return segment_datasets(df)
+
+def segment_datasets(df):
+    # Wiersze z pustym ID rozdzielają datasety - etykietą bloku jest liczba separatorów przed wierszem
+    is_separator = df['ID'].isna()
+    block_labels = is_separator.cumsum()[~is_separator]
+    rows = df[~is_separator]
+    return [block.infer_objects() for _, block in rows.groupby(block_labels, sort=False)]
+
+def _file_hash(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def _parse_cache_path(file_path, cache_dir, reader=None, sheet_name=0, columns=None):
+    # Klucz: zawartość skoroszytu + wersja generatora + backend czytający + arkusz + kolumny
+    reader = select_reader(file_path, reader)
+    key = hashlib.sha256(f"{_file_hash(file_path)}:{__version__}:{reader}:{sheet_name}:{columns}".encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+def load_cached_datasets(file_path, cache_dir=PARSE_CACHE_DIR, max_cache_mb=None, reader=None, sheet_name=0, columns=None):
+    cache_path = _parse_cache_path(file_path, cache_dir, reader, sheet_name, columns)
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                datasets = pickle.load(f)
+            # Odświeżenie czasu dostępu - przy przycinaniu usuwane są najstarsze wpisy
+            os.utime(cache_path)
+            print(f"Wczytano z cache: {cache_path}")
+            return datasets
+        except (OSError, EOFError, pickle.UnpicklingError):
+            os.remove(cache_path)
+
+    datasets = read_excel_datasets(file_path, reader, sheet_name, columns)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(datasets, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    if max_cache_mb is not None:
+        prune_parse_cache(cache_dir, max_cache_mb)
+    return datasets
+
+def prune_parse_cache(cache_dir, max_cache_mb):
+    entries = []
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith('.pkl'):
+            stat = os.stat(os.path.join(cache_dir, file_name))
+            entries.append((stat.st_mtime, stat.st_size, file_name))
+    total_size = sum(size for _, size, _ in entries)
+    # Usuń najdawniej używane wpisy, aż cache zmieści się w limicie
+    for _, size, file_name in sorted(entries):
+        if total_size <= max_cache_mb * 1024 * 1024:
+            break
+        os.remove(os.path.join(cache_dir, file_name))
+        total_size -= size
+
+def clear_parse_cache(cache_dir=PARSE_CACHE_DIR, file_path=None, reader=None, sheet_name=0, columns=None):
+    if not os.path.isdir(cache_dir):
+        return
+    if file_path is not None:
+        cache_path = _parse_cache_path(file_path, cache_dir, reader, sheet_name, columns)
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        return
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith('.pkl'):
+            os.remove(os.path.join(cache_dir, file_name))
+
+def benchmark_readers(file_path, repeat=3):
+    # Porównanie dostępnych backendów na tym samym pliku (czytanie + segmentacja)
+    ext = os.path.splitext(file_path)[1].lower()
+    results = {}
+    for name in available_readers():
+        if ext not in READER_BACKENDS[name][1]:
+            continue
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            datasets = read_excel_datasets(file_path, name)
+            timings.append(time.perf_counter() - start)
+        results[name] = (min(timings), len(datasets))
+        print(f"{name:<10} {min(timings):8.3f}s  datasety: {len(datasets)}")
+    return results
+
+def load_datasets(file_path, stream=False, cache_dir=None, max_cache_mb=None, reader=None, sheet_name=0, columns=None,
+                  stdin_format='csv', tables=None):
+    if file_path == '-':
+        return iter_stdin_blocks(stdin_format, columns)
+    if tables:
+        return iter_table_blocks(file_path, tables, reader, sheet_name, columns)
+    if select_reader(file_path, reader) == 'csv' and not cache_dir:
+        # CSV/TSV czytany modułem csv - strumieniowo i bez pandas
+        return iter_record_blocks(file_path, 'csv', sheet_name, columns)
+    if stream:
+        # Bloki są generowane w trakcie czytania arkusza
+        return iter_excel_blocks(file_path, sheet_name, columns)
+    if cache_dir:
+        return load_cached_datasets(file_path, cache_dir, max_cache_mb, reader, sheet_name, columns)
+    return read_excel_datasets(file_path, reader, sheet_name, columns)
+
+def _manifest_path(output_dir, model_name):
+    return os.path.join(output_dir, _strip_spec_extension(model_name), MANIFEST_FILE)
+
+def load_manifest(output_dir, model_name):
+    manifest_path = _manifest_path(output_dir, model_name)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        # Zmiana wersji generatora unieważnia cały manifest
+        if manifest.get('version') == __version__:
+            return manifest
+    return {'version': __version__, 'blocks': {}}
+
+def save_manifest(manifest, output_dir, model_name):
+    manifest_path = _manifest_path(output_dir, model_name)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+
+def block_fingerprint(df, base_columns):
+    if isinstance(df, list):
+        header = list(df[0].keys())
+        values = [[record.get(c) for c in header] for record in df]
+    else:
+        header = [str(c) for c in df.columns]
+        values = df.values.tolist()
+    # Wartości sprowadzone do tekstu, aby odcisk nie zależał od postaci bloku (DataFrame / rekordy)
+    values = [[None if _is_blank(value) else str(value) for value in row] for row in values]
+    rows = json.dumps([str(_block_table_name(df)), header, values], ensure_ascii=False)
+    df_columns = _block_column_names(df)
+    # Odciski widoków bazowych, które pasują do kolumn tabeli
+    bases = {view_name: hashlib.sha256(json.dumps(sorted(columns.items())).encode()).hexdigest()
+             for view_name, columns in base_columns.items() if not df_columns.isdisjoint(columns)}
+    return {'rows': hashlib.sha256(rows.encode()).hexdigest(), 'bases': bases}
+
+def emit_datasets(datasets, dataset_name, model_name, output_dir, generate_lookml, save_datasets, base_columns, incremental=False):
+    saved_datasets = []
+    output_paths = []
+    if incremental:
+        manifest = load_manifest(output_dir, model_name)
+        blocks = {}
+        skipped = 0
+    for i, dataset in enumerate(datasets):
+        if save_datasets:
+            saved_datasets.append(dataset)
+        if generate_lookml:
+            if incremental:
+                table_name = str(_block_table_name(dataset)).lower()
+                fingerprint = block_fingerprint(dataset, base_columns)
+                blocks[table_name] = fingerprint
+                output_path = os.path.join(output_dir, _strip_spec_extension(model_name), f"{table_name}.view.lkml")
+                if manifest['blocks'].get(table_name) == fingerprint and os.path.exists(output_path):
+                    skipped += 1
+                    output_paths.append(output_path)
+                    continue
+            print(f'################## nr datasetu: {i}##################')
+            output_paths.append(generate_lookml_from_excel(dataset, dataset_name, model_name, output_dir, base_columns))
+    if incremental and generate_lookml:
+        # Wpisy tabel spoza tego przebiegu (np. przy --tables) pozostają w manifeście
+        manifest['blocks'].update(blocks)
+        save_manifest(manifest, output_dir, model_name)
+        print(f"Pominięto niezmienione widoki: {skipped}")
+    if save_datasets:
+            save_datasets_to_json(saved_datasets,dataset_name)
+    return output_paths
+
+def _process_sheet(task):
+    file_path, sheet_name, model_name, output_dir, load_options, emit_options, sheet_base_columns = task
+    datasets = load_datasets(file_path, sheet_name=sheet_name, **load_options)
+    # Każdy arkusz to osobny dataset - widoki trafiają do output_dir/<model>/<arkusz>/
+    return emit_datasets(datasets, sheet_name, sheet_name, os.path.join(output_dir, model_name),
+                         base_columns=sheet_base_columns, **emit_options)
+
+def process_sheets(file_path, model_name, sheets, output_dir, load_options, emit_options, jobs=None):
+    model_name = _strip_spec_extension(model_name)
+    if sheets is None or sheets == ['all']:
+        sheets = list_sheets(file_path, load_options.get('reader'))
+    tasks = [(file_path, sheet_name, model_name, output_dir, load_options, emit_options, get_base_columns())
+             for sheet_name in sheets]
+    if jobs == 1 or len(tasks) == 1:
+        results = [_process_sheet(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_process_sheet, tasks))
+    # Wyniki w kolejności arkuszy, niezależnie od kolejności zakończenia procesów
+    return dict(zip(sheets, results))
+
+def clean_excel_file(file_path,model_name, generate_lookml, save_datasets, generate_connections, output_dir, stream=False, cache_dir=None, max_cache_mb=None, reader=None,
+                     sheets=None, jobs=None, incremental=False, project_columns=False, stdin_format='csv', dataset_name=None,
+                     tables=None):
+    # Get file name (dataset name)
+    if dataset_name is None:
+        dataset_name = _strip_spec_extension(os.path.basename(file_path))
+        
+    if generate_connections:
+        excluded_columns = ["FROM_DATE","TO_DATE","IS_LAST_FLAG","LINEAGE_ID","LOAD_TS","LAST_MOD_TS","SOURCE_SYSTEM_ID",
+"EFFECTIVE_START_DATE","EFFECTIVE_END_DATE"]
+        
+        dict_datasets =  load_dataframes_from_json("DM_CLIENT.json")
+        
+        link_data_array = create_link_data_array(dict_datasets, excluded_columns)
+
+        with open("link_data.json", "w", encoding="utf-8") as f:
+            json.dump({"linkDataArray": link_data_array}, f, indent=4)
+
+    load_options = dict(stream=stream, cache_dir=cache_dir, max_cache_mb=max_cache_mb, reader=reader,
+                        columns=SPEC_COLUMNS if project_columns else None, stdin_format=stdin_format, tables=tables)
+    emit_options = dict(generate_lookml=generate_lookml, save_datasets=save_datasets, incremental=incremental)
+    if sheets:
+        return process_sheets(file_path, model_name, sheets, output_dir, load_options, emit_options, jobs)
+
+    datasets = load_datasets(file_path, **load_options)
+    return emit_datasets(datasets, dataset_name, model_name, output_dir, base_columns=get_base_columns(), **emit_options)
+
+def expand_spec_paths(path):
+    # Katalog, wzorzec glob albo pojedynczy plik
+    if os.path.isdir(path):
+        paths = [os.path.join(path, f) for f in os.listdir(path)]
+    else:
+        paths = glob.glob(path)
+    # Pomiń pliki blokady Excela (~$...)
+    return sorted(p for p in paths if p.lower().endswith(SPEC_EXTENSIONS)
+                  and not os.path.basename(p).startswith('~$') and os.path.isfile(p))
+
+def is_batch_path(path):
+    return os.path.isdir(path) or any(c in path for c in '*?[')
+
+def _init_batch_worker(shared_base_columns):
+    # Indeks widoków bazowych przekazany raz z procesu głównego
+    global base_columns
+    base_columns = shared_base_columns
+
+def _process_workbook(task):
+    file_path, options = task
+    start = time.perf_counter()
+    try:
+        result = clean_excel_file(file_path, os.path.basename(file_path), **options)
+        views = sum(len(paths) for paths in result.values()) if isinstance(result, dict) else len(result)
+        return file_path, views, None, time.perf_counter() - start
+    except Exception as e:
+        return file_path, 0, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+def process_batch(paths, jobs=None, **options):
+    start = time.perf_counter()
+    # Arkusze w ramach skoroszytu przetwarzane sekwencyjnie - równolegle idą całe skoroszyty
+    options['jobs'] = 1
+    tasks = [(file_path, options) for file_path in paths]
+    if jobs == 1:
+        results = [_process_workbook(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker, initargs=(get_base_columns(),)) as executor:
+            results = list(executor.map(_process_workbook, tasks))
+
+    failed = [r for r in results if r[2] is not None]
+    print(f"Podsumowanie: skoroszyty: {len(results)}, widoki: {sum(r[1] for r in results)}, "
+          f"błędy: {len(failed)}, czas: {time.perf_counter() - start:.1f}s")
+    for file_path, views, error, elapsed in results:
+        status = f"BŁĄD {error}" if error else f"widoki: {views}"
+        print(f"  {file_path}: {status} ({elapsed:.1f}s)")
+    return results
+
+def load_dataframes_from_json(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    return data
+            
+def create_link_data_array(dataframes, excluded_columns=None):
+    if excluded_columns is None:
+        excluded_columns = []
+    
+    link_data_array = []
+    
+    table_columns = {}
+    for table_name, df in dataframes.items():
+        filtered_columns = [col for col in df.columns.tolist() if col not in excluded_columns]
+        table_columns[table_name] = filtered_columns
+    
+    for from_table, from_columns in table_columns.items():
+        for to_table, to_columns in table_columns.items():
+            if from_table != to_table:
+                common_columns = set(from_columns) & set(to_columns)
+                
+                for column in common_columns:
+                    link = {
+                        "from": from_table,
+                        "to": to_table,
+                        "fromPort": column,
+                        "toPort": column
+                    }
+                    
+                    reverse_link = {
+                        "from": to_table,
+                        "to": from_table,
+                        "fromPort": column,
+                        "toPort": column
+                    }
+                    
+                    if reverse_link not in link_data_array:
+                        link_data_array.append(link)
+    
+    return link_data_array         
+            
+def save_datasets_to_json(datasets,dataset_name):
+    print(datasets)
+    f_name = dataset_name + '.json'
+    dict_datasets = []
+    for d in datasets:
+        file_name = _block_table_name(d)
+        dict_datasets.append({file_name: _block_records(d)})
+    with open(f_name,'w', encoding='utf-8') as f:
+        json.dump(dict_datasets,f, indent = 4,ensure_ascii = False)
+
+    
+    print(f"Zapisano jako: {f_name}")
+    return dict_datasets
+    
+def generate_lookml_from_excel(df, dataset_name, model_name, output_dir, base_columns):
+    lookml_code_dim = []
+    lookml_code_dimgr = []
+    lookml_code_m = []
+    file_name = _block_table_name(df)
+    df_columns = _block_column_names(df) # Get columns from DataFrame
+    column_specs = build_column_specs(df)
+    
+    extends_views = []
+    include_paths = []
+    commented_dimensions = set()
+    comment_prefix = ""
+
+    missing_base_columns = {}
+    for view_name, columns in base_columns.items():
+        base_column_names = set(columns.keys())
+        if not base_column_names.isdisjoint(df_columns):
+            extends_views.append(view_name)
+            include_paths.append(f"/datasets/_base/views/{view_name}.view.lkml")
+            commented_dimensions.update(base_column_names.intersection(df_columns))
+            for col_name in base_column_names - df_columns:
+                missing_base_columns[col_name] = columns[col_name]
+
+    for column_name, description, data_type, label, group_label in column_specs:
+        table_id = file_name
+        dataset_id = dataset_name.upper()
+
+        
+
+        if column_name in predefined_columns:
+            if "dimension_group:" in predefined_columns[column_name]:
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_dimgr.append(f'    # dimension_group: {column_name} {{}}\n')
+                else:
+                    lookml_code_dimgr.append(predefined_columns[column_name])
+            elif "measure:"in predefined_columns[column_name]:
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_m.append(f'    # measure: {column_name} {{}}\n')
+                else:
+                    lookml_code_m.append(predefined_columns[column_name])
+            else:
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_dim.append(f'    # dimension: {column_name} {{}}\n')
+                else:
+                    lookml_code_dim.append(predefined_columns[column_name])
+        else:
+            if group_label == ''or group_label == ' ':
+                if data_type == 'date' or data_type == 'datetime':
+                    string_group_label = f'group_label: "{label}"'
+                else:
+                    string_group_label = 'group_label: ""'
+                
+            else:
+                string_group_label = f'group_label: "{group_label}"'
+                
+            if data_type == 'date' or data_type == 'datetime':
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_dimgr.append(f'    # dimension_group: {column_name} {{}}\n')
+                else:
+                    lookml_code_dimgr.append(
+                        """
+    dimension_group: {column_name} {{
+        label: "{label}"
+        {string_group_label}
+        description: "{description}"
+        allow_fill: yes
+        datatype: date
+        type:  time
+        timeframes: [date, day_of_week, month, quarter, year]
+        drill_fields: [{column_name}_month, {column_name}_date]
+        sql: ${{TABLE}}.{column_name} ;;
+    }}""".format(column_name=column_name, label=label, string_group_label=string_group_label, description=description)
+                    )
+            elif data_type == 'timestamp':
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_dim.append(f'    # dimension: {column_name} {{}}\n')
+                else:
+                    lookml_code_dim.append(f"""
+    dimension: {column_name} {{
+        label: "{label}"
+        {string_group_label}
+        description: "{description}"
+        type: date_time
+        convert_tz: no
+        sql: ${{TABLE}}.{column_name} ;;
+    }}
+""")
+    
+            elif data_type in ['number', 'integer', 'numeric']:
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_dim.append(f'    # dimension: {column_name} {{}}\n')
+                else:
+                    lookml_code_dim.append(comment_prefix + f"""
+    dimension: {column_name} {{
+        label: "{label}"
+        {string_group_label}
+        description: "{description}"
+        type: number
+        sql: ${{TABLE}}.{column_name} ;;
+    }}
+""")
+            elif data_type == 'string':
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_dim.append(f'    # dimension: {column_name} {{}}\n')
+                else:
+                    lookml_code_dim.append(f"""
+    dimension: {column_name} {{
+        label: "{label}"
+        {string_group_label}
+        description: "{description}"
+        type: string
+        sql: ${{TABLE}}.{column_name} ;;
+    }}
+""")
+            elif data_type == 'yesno':
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_dim.append(f'    # dimension: {column_name} {{}}\n')
+                else:
+                    lookml_code_dim.append(comment_prefix + f"""
+    dimension: {column_name} {{
+        label: "{label}"
+        {string_group_label}
+        description: "{description}"
+        type: yesno
+        sql: ${{TABLE}}.{column_name} ;;
+    }}
+""")
+            elif data_type == 'sum':
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_m.append(f'    # measure: {column_name}_sum {{}}\n')
+                else:
+                    lookml_code_m.append(comment_prefix + f"""
+    measure: {column_name}_sum {{
+        label: "{label}"
+        {string_group_label}
+        description: "{description}"
+        type: sum
+        group_label: " Miary sumaryczne"
+        value_format_name: liczba_2d
+        sql: ${{{column_name}}} ;;
+    }}
+""")
+            elif data_type == 'count':
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_m.append(f'    # measure: {column_name}_count {{}}\n')
+                else:
+                    lookml_code_m.append(comment_prefix + f"""
+    measure: {column_name}_count {{
+        label: "{label}"
+        {string_group_label}
+        description: "{description}"
+        type: count
+        group_label: " Miary ilościowe"
+        value_format_name: liczba_2d
+        sql: ${{{column_name}}} ;;
+    }}
+""")
+            else:
+                if column_name.upper() in commented_dimensions:
+                    lookml_code_dim.append(f'    # dimension: {column_name} {{}}\n')
+                else:
+                    lookml_code_dim.append(comment_prefix + f"""
+    dimension: {column_name} {{
+        label: "{label}"
+        {string_group_label}
+        description: "{description}"
+        type: {data_type}
+        sql: ${{TABLE}}.{column_name} ;;
+    }}
+""")
+
+    # Add hidden dimensions for missing base columns
+    for col_name, col_type in missing_base_columns.items():
+        lookml_code_dim.append(f'    {col_type}: {col_name.lower()} {{hidden: yes}}\n')
+
+    model_name = _strip_spec_extension(model_name)
+    model_specific_output_dir = os.path.join(output_dir, model_name)
+    os.makedirs(model_specific_output_dir, exist_ok=True)
+    file_name = file_name.lower()
+    output_path = os.path.join(model_specific_output_dir, f"{file_name}.view.lkml")
+
+    with open(output_path, 'w', encoding = "utf-8") as f:
+        for path in include_paths:
+            f.write(f'include: "{path}"\n')
+        f.write("view: {} {{\n  sql_table_name: `{}.{{_user_attributes['bank_id']}}.{} ` ;; \n".format(table_id.lower(), dataset_id, table_id))
+        if extends_views:
+            f.write(f"  extends: [{', '.join(extends_views)}]\n")
+        f.write(''.join(lookml_code_dim))
+        f.write(''.join(lookml_code_dimgr))
+        f.write(''.join(lookml_code_m))
+        f.write("\n}")
+
+    return output_path
+
+def measure_import_time(module_name='lookml_generator'):
+    # Skumulowany czas importu modułu w mikrosekundach wg python -X importtime (świeży interpreter)
+    import subprocess
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+                            cwd=module_dir, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module_name:
+            return int(parts[1])
+    raise RuntimeError(f"Brak {module_name} w wyniku -X importtime")
+
+def check_import_time(budget_ms):
+    import_ms = measure_import_time() / 1000
+    print(f"Czas importu: {import_ms:.1f} ms (limit: {budget_ms} ms)")
+    return import_ms <= budget_ms
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate LookML from an Excel file.')
+    parser.add_argument("file_path", nargs="?", help="Path to the Excel file, a directory / glob pattern for batch mode, or - to read the spec from stdin")
+    parser.add_argument("--output_dir", default="#generated", help="Directory to save generated LookML files.")
+    parser.add_argument("--save_datasets", action="store_true", help="Save datasets to JSON")
+    parser.add_argument("--generate_lookml", action="store_true", default=True, help="Generate LookML")
+    parser.add_argument("--generate_connections", action="store_true", help="Generate connections")
+    parser.add_argument("--stream", action="store_true", help="Read the sheet block by block (openpyxl read-only) and generate each view as soon as its block is read")
+    parser.add_argument("--reader", choices=list(READER_BACKENDS), help="Spreadsheet reader backend (default: fastest available for the file type)")
+    parser.add_argument("--benchmark_readers", action="store_true", help="Compare available reader backends on file_path and exit")
+    parser.add_argument("--sheets", type=lambda value: value.split(','), help="Comma separated sheet names, or 'all'. Each sheet is a separate dataset written to output_dir/<model>/<sheet>/")
+    parser.add_argument("--jobs", type=int, default=None, help="Number of worker processes for --sheets or batch mode (default: CPU count)")
+    parser.add_argument("--incremental", action="store_true", help="Regenerate only views whose block or matching base views changed since the last run (tracked in a manifest in the model output folder)")
+    parser.add_argument("--project_columns", action="store_true", help="Read only the columns used for generation (%s) and keep low-cardinality ones as categoricals" % ', '.join(SPEC_COLUMNS))
+    parser.add_argument("--parse_cache", action="store_true", help="Reuse parsed datasets cached by workbook content hash and generator version")
+    parser.add_argument("--cache_dir", default=PARSE_CACHE_DIR, help="Directory of the parse cache.")
+    parser.add_argument("--cache_max_mb", type=float, default=512, help="Size cap of the parse cache in MB (least recently used entries are removed first).")
+    parser.add_argument("--clear_cache", action="store_true", help="Remove all parse cache entries before running")
+    parser.add_argument("--tables", type=lambda value: value.split(','), help="Comma separated TABLE NAMEs to generate; only their row ranges are parsed (using a pre-scan index cached next to the workbook)")
+    parser.add_argument("--stdin_format", choices=STDIN_FORMATS, default="csv", help="Format of the spec read from stdin when file_path is - (CSV/TSV with a header line, or JSON Lines)")
+    parser.add_argument("--dataset_name", help="Dataset (and model folder) name; required when reading from stdin")
+    parser.add_argument("--import_time_budget", type=float, metavar="MS", help="Check that importing the module stays within MS milliseconds (python -X importtime) and exit")
+    args = parser.parse_args()
+
+    if args.import_time_budget is not None:
+        raise SystemExit(0 if check_import_time(args.import_time_budget) else 1)
+    if args.file_path is None:
+        parser.error("the following arguments are required: file_path")
+
+    if args.clear_cache:
+        clear_parse_cache(args.cache_dir)
+
+    if args.benchmark_readers:
+        benchmark_readers(args.file_path)
+        raise SystemExit(0)
+
+    if is_batch_path(args.file_path):
+        paths = expand_spec_paths(args.file_path)
+        if not paths:
+            parser.error(f"Brak plików specyfikacji dla: {args.file_path}")
+        results = process_batch(paths, args.jobs, generate_lookml=args.generate_lookml, save_datasets=args.save_datasets,
+                                generate_connections=args.generate_connections, output_dir=args.output_dir, stream=args.stream,
+                                cache_dir=args.cache_dir if args.parse_cache else None, max_cache_mb=args.cache_max_mb,
+                                reader=args.reader, sheets=args.sheets, incremental=args.incremental,
+                                project_columns=args.project_columns, tables=args.tables)
+        raise SystemExit(1 if any(error for _, _, error, _ in results) else 0)
+
+    if args.file_path == '-' and args.dataset_name is None:
+        parser.error("--dataset_name is required when reading from stdin")
+    model_name = args.dataset_name or os.path.basename(args.file_path)
+    
+    clean_excel_file(args.file_path, model_name, args.generate_lookml, args.save_datasets, args.generate_connections, args.output_dir, args.stream,
+                     args.cache_dir if args.parse_cache else None, args.cache_max_mb, args.reader,
+                     args.sheets, args.jobs, args.incremental, args.project_columns, args.stdin_format, args.dataset_name,
+                     args.tables)
\ No newline at end of file
@@ -0,0 +1,41 @@
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lookml_generator
+
+SPEC_ROWS = [
+    ['Spec', '', '', '', '', '', ''],
+    ['', '', '', '', '', '', ''],
+    ['ID', 'TABLE NAME', 'COLUMN NAME', 'TYPE', 'DESCRIPTION', 'LABEL', 'GROUP_LABEL'],
+    ['1', 'A_T', 'X', 'string', 'NA', 'N/A', 'null'],
+    ['2', 'A_T', 'Y', 'number', 'Opis "Y"', 'Y', ''],
+    # Separator z ID 'N/A' - pd.read_csv traktuje go jak pustą komórkę
+    ['N/A', '-', '-', '', '', '', ''],
+    ['3', 'B_T', 'Z', 'string', 'Opis Z', '#N/A', ''],
+    ['4', 'B_T', 'W', 'string', '', 'nan', 'G'],
+    ['', 'koniec B_T', '', '', '', '', ''],
+    ['', '', '', '', '', '', ''],
+    ['5', 'C_T', 'V', 'date', 'None', 'V', 'NULL'],
+]
+
+
+def _blocks(datasets):
+    # Nazwa tabeli i dane kolumn użyte w widoku - niezależnie od postaci bloku (rekordy / DataFrame)
+    return [(str(lookml_generator._block_table_name(block)), lookml_generator.build_column_specs(block))
+            for block in datasets]
+
+
+@pytest.mark.parametrize('extension, delimiter', [('.csv', ','), ('.tsv', '\t')])
+def test_native_csv_blocks_match_pandas(tmp_path, extension, delimiter):
+    pytest.importorskip('pandas')
+    spec_path = str(tmp_path / f'spec{extension}')
+    with open(spec_path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f, delimiter=delimiter).writerows(SPEC_ROWS)
+    native = _blocks(lookml_generator.load_datasets(spec_path))
+    pandas_blocks = _blocks(lookml_generator.read_excel_datasets(spec_path, 'csv'))
+    assert [table for table, _ in native] == ['A_T', 'B_T', 'C_T']
+    assert native == pandas_blocks
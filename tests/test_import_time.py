@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE_NAME = 'lookml_generator'
+# Limit czasu importu modułu - sam import pandas (ok. 400 ms) go przekracza
+IMPORT_TIME_BUDGET_MS = 250
+
+
+def _import_time_log():
+    # python -X importtime w świeżym interpreterze, uruchomionym poza katalogiem projektu
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {MODULE_NAME}'],
+                            cwd=os.path.dirname(REPO_DIR), env={**os.environ, 'PYTHONPATH': REPO_DIR},
+                            capture_output=True, text=True, check=True)
+    # Wiersze: "import time: self [us] | cumulative | imported package"
+    entries = {}
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[1].isdigit():
+            entries[parts[2].strip()] = int(parts[1])
+    return entries
+
+
+def test_import_time_within_budget():
+    entries = _import_time_log()
+    import_ms = entries[MODULE_NAME] / 1000
+    assert import_ms <= IMPORT_TIME_BUDGET_MS, f"Import {MODULE_NAME}: {import_ms:.1f} ms (limit {IMPORT_TIME_BUDGET_MS} ms)"
+
+
+def test_import_skips_heavy_libraries():
+    entries = _import_time_log()
+    assert not {'pandas', 'numpy', 'openpyxl'} & set(entries)
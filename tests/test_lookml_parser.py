@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lookml_generator
+
+VIEW = '''view: orders {
+  extends: [_base_a, _base_b]
+  # dimension: commented { type: string }
+  dimension: id {
+    label: "Id - dimension: fake {"
+    type: number
+    sql: ${TABLE}.id ; "measure: fake ;" ;;
+    link: { label: "L" url: "u" type: string }
+  }
+  dimension_group: created { type: time timeframes: [raw, date] sql: ${TABLE}.created ;; }
+  measure: total { type: sum sql: ${amount} ;; value_format_name: usd }
+}
+'''
+EXPECTED = {
+    'fields': {'ID': 'dimension', 'CREATED': 'dimension_group', 'TOTAL': 'measure'},
+    'types': {'ID': 'number', 'CREATED': 'time', 'TOTAL': 'sum'},
+    'extends': ['_base_a', '_base_b'],
+}
+# Blok zagnieżdżony głębiej niż szybka ścieżka - plik przechodzi do skanera tokenów
+DEEP = VIEW.replace('link: { label: "L"', 'link: { a: { b: { c: { type: yesno } } } label: "L"')
+
+
+@pytest.mark.parametrize('content', [VIEW, DEEP, VIEW.replace('"u"', '"\\"u\\""')])
+def test_parse_lookml_view_matches_scanner(content):
+    assert lookml_generator.parse_lookml_view(content) == EXPECTED
+    assert lookml_generator._scan_lookml_view(content, '\\' in content) == EXPECTED
+
+
+def test_unterminated_sql_runs_to_end_of_file():
+    content = 'dimension: a { type: string sql: x ; dimension: b { type: number }'
+    assert lookml_generator.parse_lookml_view(content) == {'fields': {'A': 'dimension'}, 'types': {'A': 'string'},
+                                                           'extends': []}
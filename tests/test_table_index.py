@@ -0,0 +1,32 @@
+import csv
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lookml_generator
+
+SPEC_ROWS = [
+    ['Spec', '', '', '', '', '', ''],
+    ['ID', 'TABLE NAME', 'COLUMN NAME', 'TYPE', 'DESCRIPTION', 'LABEL', 'GROUP_LABEL'],
+    ['1', 'A_T', 'X', 'string', 'Opis X', 'X', ''],
+    ['', '', '', '', '', '', ''],
+    ['2', 'B_T', 'Y', 'number', 'Opis Y', 'Y', ''],
+]
+
+
+@pytest.mark.parametrize('content', ['{"key": {"version": "', '[]', ''])
+def test_corrupt_table_index_is_rescanned(tmp_path, content):
+    spec_path = str(tmp_path / 'spec.csv')
+    with open(spec_path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(SPEC_ROWS)
+    index_path = lookml_generator._table_index_path(spec_path)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    entry = lookml_generator.load_table_index(spec_path)
+    assert entry == json.loads(json.dumps(lookml_generator.scan_table_index(spec_path), default=str))
+    # Indeks nadpisany poprawnym plikiem
+    with open(index_path, 'r', encoding='utf-8') as f:
+        assert json.load(f)['sheets']['0'] == entry